@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+
+# Compact dtypes of the apartment sales frames, shared by training (train_aptsales.py) and predict_apt.
+# Repeated strings become categoricals; prices, areas, years and floors use 16/32-bit types.
+# (RandomForest casts its input to float32 anyway, so the downcasts do not change the trees.)
+CATEGORY_COLUMNS = ['시군구', '단지명', '도로명']
+NUMERIC_DTYPES = {
+    'NO': 'int32',
+    '거래금액(만원)': 'int32',
+    '전용면적(㎡)': 'float32',
+    '층': 'int16',
+    '건축년도': 'int16',
+    '본번': 'int32',
+    '부번': 'int32',
+    '계약년': 'int16',
+    '계약월': 'int8',
+    '가계대출_금리': 'float32',
+    'price_ewma_3': 'float32',
+    '법정동코드': 'int64',   # 10-digit codes do not fit in int32
+}
+
+def apply_schema(df, categories=True):
+    """
+    Casts the known columns of df to the compact schema (in place) and returns df.
+    - Numeric columns are only cast when they are already numeric; integer targets fall back
+      to float32 when the column has missing values.
+    - categories=False keeps string columns as they are (used for prediction inputs, whose
+      encoders map by value).
+    """
+    for col, dtype in NUMERIC_DTYPES.items():
+        if col not in df.columns or not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        if np.issubdtype(np.dtype(dtype), np.integer) and df[col].isna().any():
+            dtype = 'float32'
+        df[col] = df[col].astype(dtype)
+    if categories:
+        for col in CATEGORY_COLUMNS:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype('category')
+    return df
+
+def memory_mb(df):
+    """Deep memory usage of df in MB."""
+    return df.memory_usage(deep=True).sum() / 1024 ** 2
+
+def memory_report(before, after):
+    """
+    Per-column memory usage before/after apply_schema.
+    :param before: df.memory_usage(deep=True) taken before the cast
+    :return: DataFrame with before_mb, after_mb and ratio per column (plus a 'total' row)
+    """
+    after = after.memory_usage(deep=True)
+    report = pd.DataFrame({'before_mb': before / 1024 ** 2, 'after_mb': after / 1024 ** 2})
+    report.loc['total'] = report.sum()
+    report['ratio'] = report['after_mb'] / report['before_mb']
+    return report
@@ -0,0 +1,104 @@
+"""
+CompiledForest parity check and latency benchmark.
+- For every city whose model files exist (or a synthetic forest when none do), compares
+  CompiledForest.predict with model.predict on random inputs and requires an exact match,
+  for dense and CSR input.
+- Then times single-row predictions of both backends.
+Usage: python benchmark_forest.py [seoul busan ...]
+"""
+import os
+import sys
+import time
+import joblib
+import numpy as np
+from scipy import sparse
+
+from compiled_forest import CompiledForest
+
+N_CHECK_ROWS = 20000
+N_LATENCY_CALLS = 200
+RANDOM_STATE = 42
+
+_script_dir = os.path.dirname(os.path.abspath(__file__))
+
+def synthetic_forest():
+    """A forest of the same shape as the city models (100 trees, ~400 mostly one-hot columns)."""
+    from sklearn.ensemble import RandomForestRegressor
+    rng = np.random.default_rng(RANDOM_STATE)
+    n_rows, n_dense, n_onehot = 50000, 12, 400
+    X = np.zeros((n_rows, n_dense + n_onehot), dtype=np.float32)
+    X[:, :n_dense] = rng.normal(size=(n_rows, n_dense))
+    X[np.arange(n_rows), n_dense + rng.integers(0, n_onehot, n_rows)] = 1
+    y = X[:, :n_dense] @ rng.normal(size=n_dense) + X[:, n_dense:] @ rng.normal(size=n_onehot) * 3
+    return RandomForestRegressor(n_estimators=100, random_state=RANDOM_STATE, n_jobs=-1).fit(X, y)
+
+def random_inputs(model, n_rows, rng):
+    """Random rows spanning each feature's split thresholds, so both branches of every split are taken."""
+    n_features = model.n_features_in_
+    low = np.zeros(n_features)
+    high = np.ones(n_features)
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        split = tree.feature >= 0
+        np.minimum.at(low, tree.feature[split], tree.threshold[split] - 1)
+        np.maximum.at(high, tree.feature[split], tree.threshold[split] + 1)
+    X = rng.uniform(low, high, size=(n_rows, n_features))
+    # Exact thresholds for a few rows: the "<=" boundary must be handled like sklearn
+    tree = model.estimators_[0].tree_
+    split = np.flatnonzero(tree.feature >= 0)[:min(n_rows, 1000)]
+    X[np.arange(len(split)), tree.feature[split]] = tree.threshold[split]
+    return X.astype(np.float32)
+
+def best_latency(func, x):
+    times = []
+    for _ in range(N_LATENCY_CALLS):
+        start = time.perf_counter()
+        func(x)
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000
+
+def check(name, model):
+    rng = np.random.default_rng(RANDOM_STATE)
+    start = time.perf_counter()
+    forest = CompiledForest(model)
+    print(f"\n--- {name}: {forest.n_trees} trees, {forest.n_nodes} nodes, depth {forest.max_depth}, "
+          f"{forest.nbytes / 1024 ** 2:.1f} MB (compiled in {time.perf_counter() - start:.2f}s) ---")
+
+    X = random_inputs(model, N_CHECK_ROWS, rng)
+    n_jobs = model.n_jobs
+    model.set_params(n_jobs=1)   # sklearn adds the tree predictions in estimator order only when sequential
+    expected = model.predict(X)
+    expected_trees = np.stack([e.predict(X) for e in model.estimators_])
+    model.set_params(n_jobs=n_jobs)
+
+    ok = np.array_equal(forest.predict_trees(X), expected_trees) and np.array_equal(forest.predict(X), expected)
+    print(f"parity on {N_CHECK_ROWS} rows: {'exact match' if ok else 'MISMATCH'}")
+    # CSR with most entries zero, like the 시군구 one-hot model inputs
+    X_sparse = sparse.csr_matrix(np.where(rng.random(X.shape) < 0.9, 0, X).astype(np.float32))
+    ok_sparse = np.array_equal(forest.predict(X_sparse), forest.predict(X_sparse.toarray()))
+    print(f"CSR parity on {N_CHECK_ROWS} rows: {'exact match' if ok_sparse else 'MISMATCH'}")
+    ok = ok and ok_sparse
+
+    row = X[:1]
+    t_sklearn = best_latency(model.predict, row)
+    t_compiled = best_latency(forest.predict, row)
+    print(f"single row: model.predict {t_sklearn:.2f} ms, compiled {t_compiled:.3f} ms ({t_sklearn / t_compiled:.0f}x)")
+    return ok
+
+def main():
+    cities = sys.argv[1:] or ['seoul', 'busan', 'daegu', 'incheon', 'gwangju', 'daejeon', 'ulsan', 'gyeonggi']
+    models = {}
+    for city in cities:
+        path = os.path.join(_script_dir, f'rf_model_{city}.joblib')
+        if os.path.exists(path):
+            models[city] = joblib.load(path)
+    if not models:
+        print("[INFO] No city model files found; using a synthetic forest.")
+        models['synthetic'] = synthetic_forest()
+
+    results = [check(name, model) for name, model in models.items()]
+    if not all(results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import os
+import joblib
+import pandas as pd
+
+# Only codes whose '폐지여부' is '존재' are indexed
+ACTIVE_STATUS = '존재'
+
+# Multiple-match policy: when one 법정동명 maps to several active codes,
+# the first code in si_code.csv order is used (the name is also recorded in 'duplicates')
+DUPLICATE_POLICY = 'first'
+
+# In-memory cache of loaded indexes, keyed by si_code.csv path
+_loaded_indexes = {}
+
+def normalize_dong_name(name):
+    """Normalizes a 법정동명 for lookup (trims and collapses whitespace)."""
+    return ' '.join(str(name).split())
+
+def _source_signature(si_code_path):
+    stat = os.stat(si_code_path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+def build_bjd_index(si_code_df):
+    """
+    Builds a dict index from normalized 법정동명 to 법정동코드 (active codes only).
+    :return: dict with 'codes' ({name: code}) and 'duplicates' (names with several active codes)
+    """
+    active = si_code_df[si_code_df['폐지여부'] == ACTIVE_STATUS]
+    names = active['법정동명'].map(normalize_dong_name)
+    first = ~names.duplicated(keep='first')
+    return {
+        'codes': dict(zip(names[first], active['법정동코드'][first])),
+        'duplicates': set(names[names.duplicated(keep=False)]),
+        'policy': DUPLICATE_POLICY,
+    }
+
+def load_bjd_index(si_code_path, index_path=None):
+    """
+    Loads the 법정동코드 index, building it from si_code.csv only when needed.
+    The built index is persisted to index_path and reused while si_code.csv is unchanged.
+    """
+    if si_code_path in _loaded_indexes:
+        return _loaded_indexes[si_code_path]
+
+    try:
+        signature = _source_signature(si_code_path)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"si_code.csv not found at {si_code_path}. Please ensure it exists.")
+
+    index = None
+    if index_path and os.path.exists(index_path):
+        cached = joblib.load(index_path)
+        if cached.get('source') == signature and cached.get('policy') == DUPLICATE_POLICY:
+            index = cached
+
+    if index is None:
+        print(f"Building 법정동코드 index from {os.path.basename(si_code_path)}...")
+        index = build_bjd_index(pd.read_csv(si_code_path))
+        index['source'] = signature
+        if index_path:
+            joblib.dump(index, index_path)
+
+    _loaded_indexes[si_code_path] = index
+    return index
+
+def map_bjd_codes(names, index):
+    """Maps a Series of 법정동명 to 법정동코드 (NaN when not found)."""
+    normalized = names.where(names.isna(), names.astype(str).str.split().str.join(' '))
+    return normalized.map(index['codes'])
@@ -0,0 +1,118 @@
+import numpy as np
+from scipy import sparse
+
+# Fitted RandomForestRegressor -> one set of contiguous node arrays, evaluated with NumPy.
+# Every tree is walked for every row at once (one gather per depth level), so a single-row
+# prediction costs a few dozen small array operations instead of 100 estimator.predict calls
+# dispatched through joblib. Results match model.predict exactly:
+# - X is cast to float32 and compared with the float64 thresholds like sklearn's trees
+# - the per-tree values are summed in estimator order (cumsum, no pairwise summation) and
+#   divided by the number of trees, like RandomForestRegressor.predict with n_jobs=1
+# CSR input (the predict_apt model inputs) is walked directly: each split looks its value up
+# among the row's stored entries (binary search), and missing entries are 0 like in sklearn.
+# The arrays take about 28 bytes per node on top of the loaded model.
+
+TREE_LEAF = -1
+
+def average_trees(tree_values):
+    """(n_trees, n_rows) per-tree predictions -> forest prediction, summed in tree order like sklearn."""
+    return np.cumsum(tree_values, axis=0)[-1] / tree_values.shape[0]
+
+def tree_quantiles(tree_values, quantiles):
+    """(n_trees, n_rows) per-tree predictions -> (n_rows, len(quantiles)) quantiles of the tree distribution."""
+    return np.quantile(tree_values, np.atleast_1d(np.asarray(quantiles, dtype=np.float64)), axis=0).T
+
+class CompiledForest:
+
+    def __init__(self, model):
+        estimators = getattr(model, 'estimators_', None)
+        if not estimators:
+            raise ValueError("CompiledForest needs a fitted forest (estimators_ is missing).")
+        trees = [e.tree_ for e in estimators]
+        if any(t.n_outputs != 1 for t in trees):
+            raise ValueError("CompiledForest supports single-output regression forests only.")
+
+        sizes = np.array([t.node_count for t in trees], dtype=np.int64)
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+        total = int(sizes.sum())
+        index_dtype = np.int32 if total < np.iinfo(np.int32).max else np.int64
+
+        self.left = np.empty(total, dtype=index_dtype)
+        self.right = np.empty(total, dtype=index_dtype)
+        self.feature = np.empty(total, dtype=np.int32)
+        self.threshold = np.empty(total, dtype=np.float64)
+        self.value = np.empty(total, dtype=np.float64)
+        for tree, offset in zip(trees, offsets):
+            nodes = slice(offset, offset + tree.node_count)
+            is_leaf = tree.children_left == TREE_LEAF
+            # Leaves point to themselves and always go "left", so finished rows just stay put
+            self_index = np.arange(offset, offset + tree.node_count, dtype=index_dtype)
+            self.left[nodes] = np.where(is_leaf, self_index, tree.children_left + offset)
+            self.right[nodes] = np.where(is_leaf, self_index, tree.children_right + offset)
+            self.feature[nodes] = np.where(is_leaf, 0, tree.feature)
+            self.threshold[nodes] = np.where(is_leaf, np.inf, tree.threshold)
+            self.value[nodes] = tree.value[:, 0, 0]
+
+        self.roots = offsets.astype(index_dtype)
+        self.max_depth = max(t.max_depth for t in trees)
+        self.n_trees = len(trees)
+        self.n_nodes = total
+        self.n_features = model.n_features_in_
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.left, self.right, self.feature, self.threshold, self.value))
+
+    def _validate(self, X):
+        if sparse.issparse(X):
+            X = X.tocsr().astype(np.float32)   # astype copies, so sum_duplicates leaves the caller's matrix alone
+            X.sum_duplicates()                  # sorted, unique indices per row
+            values = X.data
+        else:
+            X = np.ascontiguousarray(X, dtype=np.float32)
+            values = X
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"X has shape {X.shape}, but the forest expects {self.n_features} features.")
+        if not np.isfinite(values).all():
+            raise ValueError("Input contains NaN or infinity.")
+        return X
+
+    def _gather(self, X):
+        """
+        X -> function mapping flat indices (row * n_features + feature) to feature values.
+        Dense X is indexed directly; CSR X is searched in its sorted flat indices without densifying.
+        """
+        if not sparse.issparse(X):
+            return X.ravel().__getitem__
+        if X.nnz == 0:
+            return lambda flat_index: np.zeros(flat_index.shape, dtype=np.float32)
+        row_start = np.arange(X.shape[0], dtype=np.int64) * self.n_features
+        keys = np.repeat(row_start, np.diff(X.indptr)) + X.indices
+        data = X.data
+
+        def gather(flat_index):
+            pos = np.minimum(np.searchsorted(keys, flat_index), len(keys) - 1)
+            return np.where(keys[pos] == flat_index, data[pos], np.float32(0))
+        return gather
+
+    def apply(self, X):
+        """Leaf node (global index) of every tree for every row, shape (n_trees, n_rows)."""
+        X = self._validate(X)
+        n_rows = X.shape[0]
+        gather = self._gather(X)
+        row_start = (np.arange(n_rows, dtype=np.int64) * self.n_features)[None, :]
+        node = np.repeat(self.roots[:, None], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            go_left = gather(row_start + self.feature[node]) <= self.threshold[node]
+            next_node = np.where(go_left, self.left[node], self.right[node])
+            if np.array_equal(next_node, node):
+                break
+            node = next_node
+        return node
+
+    def predict_trees(self, X):
+        """Per-tree predictions, shape (n_trees, n_rows) (same as [e.predict(X) for e in estimators_])."""
+        return self.value[self.apply(X)]
+
+    def predict(self, X):
+        return average_trees(self.predict_trees(X))
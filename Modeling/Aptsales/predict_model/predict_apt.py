@@ -1,8 +1,14 @@
 
 import joblib
+import numpy as np
 import pandas as pd
 import os
 import inspect
+import sys
+import threading
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 # City mapping for dynamic model loading
 CITY_MAP = {
@@ -19,61 +25,162 @@ CITY_MAP = {
 # Global variables to store loaded models and encoders to avoid reloading
 _loaded_models = {}
 _loaded_tes = {}
-_loaded_ohes = {}
+_loaded_layouts = {}
 _loaded_model_columns = {}
+_compiled_forests = {}
+_city_locks = {city: threading.Lock() for city in CITY_MAP.values()}
 
-_si_code_df = None
+_bjd_index = None
+
+# Default number of records encoded per batch in predict_prices
+DEFAULT_CHUNK_SIZE = 10000
+
+# Quantiles of the per-tree predictions used by the example below (P10/P50/P90)
+DEFAULT_QUANTILES = [0.1, 0.5, 0.9]
 
 # Get the directory of the current script
 _script_dir = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
 
-def _load_si_code_df():
-    global _si_code_df
-    if _si_code_df is None:
-        print("Loading si_code.csv...")
-        try:
-            si_code_path = os.path.join(_script_dir, 'si_code.csv')
-            _si_code_df = pd.read_csv(si_code_path)
-        except FileNotFoundError:
-            raise FileNotFoundError(f"si_code.csv not found at {si_code_path}. Please ensure it exists.")
-    return _si_code_df
+sys.path.append(_script_dir)
+from bjd_index import load_bjd_index, normalize_dong_name
+from apt_schema import apply_schema
+from sparse_encoding import ColumnLayout, build_csr
+from compiled_forest import CompiledForest, average_trees, tree_quantiles
 
-def _load_city_models(city_korean):
-    """Loads models and encoders for a given city, caching them."""
-    city_english = None
+def _load_bjd_index():
+    """Loads the 법정동명 -> 법정동코드 hash index (persisted next to the models)."""
+    global _bjd_index
+    if _bjd_index is None:
+        _bjd_index = load_bjd_index(
+            os.path.join(_script_dir, 'si_code.csv'),
+            index_path=os.path.join(_script_dir, 'bjd_code_index.joblib')
+        )
+    return _bjd_index
+
+def _resolve_city(city_korean):
+    """Maps a Korean city name (e.g. '서울특별시') to the English model suffix."""
     for k, v in CITY_MAP.items():
         if city_korean.startswith(k):
-            city_english = v
-            break
+            return v
+    raise ValueError(f"Unsupported city: {city_korean}. Please provide a valid city name.")
+
+def _load_city_models_by_key(city_english):
+    """
+    Loads models and encoders for a city suffix (e.g. 'seoul'), caching them. Thread-safe.
+    :return: (model, target encoder, ColumnLayout of the model columns, model columns)
+    """
+    if city_english in _loaded_models:
+        return _loaded_models[city_english], _loaded_tes[city_english], _loaded_layouts[city_english], _loaded_model_columns[city_english]
+
+    with _city_locks[city_english]:
+        if city_english not in _loaded_models:
+            print(f"Loading models for {city_english}...")
+            try:
+                te = joblib.load(os.path.join(_script_dir, f'target_encoder_{city_english}.joblib'))
+                model_columns = joblib.load(os.path.join(_script_dir, f'model_columns_{city_english}.joblib'))
+                model = joblib.load(os.path.join(_script_dir, f'rf_model_{city_english}.joblib'))
+            except FileNotFoundError as e:
+                raise FileNotFoundError(f"Model files for {city_english} not found. Please ensure {e.filename} exists in the current directory.")
+
+            _loaded_tes[city_english] = te
+            # The one-hot columns are filled from the column layout, so the one-hot encoders are not loaded.
+            # As before, 시군구 is one-hot encoded only for cities trained with an encoder (onehot_encoder_<city>
+            # exists, e.g. seoul, incheon); the get_dummies cities keep their 시군구_* columns at 0.
+            set_onehot = os.path.exists(os.path.join(_script_dir, f'onehot_encoder_{city_english}.joblib'))
+            _loaded_layouts[city_english] = ColumnLayout(list(model_columns), set_onehot=set_onehot)
+            _loaded_model_columns[city_english] = model_columns
+            # Set last: a city counts as loaded only once every artifact is in place
+            _loaded_models[city_english] = model
     
-    if not city_english:
-        raise ValueError(f"Unsupported city: {city_korean}. Please provide a valid city name.")
+    return _loaded_models[city_english], _loaded_tes[city_english], _loaded_layouts[city_english], _loaded_model_columns[city_english]
 
-    if city_english not in _loaded_models:
-        print(f"Loading models for {city_korean} ({city_english})...")
+def _load_city_models(city_korean):
+    """Loads models and encoders for a given city, caching them."""
+    return _load_city_models_by_key(_resolve_city(city_korean))
+
+def _tree_arrays_nbytes(model):
+    """
+    Estimated size of a fitted forest's tree arrays (node_count x node record + values).
+    This is not the resident memory of the process: it leaves out the Python objects and allocator overhead.
+    """
+    from sklearn.tree._tree import NODE_DTYPE
+    total = 0
+    for estimator in getattr(model, 'estimators_', []):
+        tree = estimator.tree_
+        total += tree.node_count * NODE_DTYPE.itemsize + tree.value.nbytes
+    return total
+
+def compile_forests(cities=None):
+    """
+    Switches cities to the compiled (flattened NumPy) forest backend; predictions are identical to model.predict.
+    Loads the models first if needed. Cities that are not compiled keep using model.predict.
+    :param cities: Korean ('서울') or English ('seoul') city names. Defaults to all cities.
+    :return: dict {city: {'seconds': float, 'nodes': int, 'mb': float, 'error': str or None}}
+    """
+    city_keys = list(CITY_MAP.values()) if cities is None else [c if c in _city_locks else _resolve_city(c) for c in cities]
+
+    report = {}
+    for city_english in city_keys:
+        start = time.perf_counter()
         try:
-            _loaded_models[city_english] = joblib.load(os.path.join(_script_dir, f'rf_model_{city_english}.joblib'))
-            _loaded_tes[city_english] = joblib.load(os.path.join(_script_dir, f'target_encoder_{city_english}.joblib'))
-            _loaded_model_columns[city_english] = joblib.load(os.path.join(_script_dir, f'model_columns_{city_english}.joblib'))
-            
-            # Load OneHotEncoder for cities that use it
-            if city_english in ['incheon', 'seoul']:
-                _loaded_ohes[city_english] = joblib.load(os.path.join(_script_dir, f'onehot_encoder_{city_english}.joblib'))
-            else:
-                _loaded_ohes[city_english] = None # Explicitly set to None for other cities
+            model = _load_city_models_by_key(city_english)[0]
         except FileNotFoundError as e:
-            raise FileNotFoundError(f"Model files for {city_korean} not found. Please ensure {e.filename} exists in the current directory.")
-    
-    return _loaded_models[city_english], _loaded_tes[city_english], _loaded_ohes[city_english], _loaded_model_columns[city_english]
+            report[city_english] = {'seconds': time.perf_counter() - start, 'nodes': None, 'mb': None, 'error': str(e)}
+            continue
+        if city_english not in _compiled_forests:
+            _compiled_forests[city_english] = CompiledForest(model)
+        forest = _compiled_forests[city_english]
+        report[city_english] = {'seconds': time.perf_counter() - start, 'nodes': forest.n_nodes,
+                                'mb': forest.nbytes / 1024 ** 2, 'error': None}
+    return report
 
-def predict_price(input_data):
+def warm_up(cities=None, max_workers=None, compile=False):
     """
-    아파트 정보를 입력받아 예상 매매가를 예측하는 함수
-    :param input_data: dict 형태의 아파트 정보
-    :return: float 형태의 예측 가격 (만원 단위)
+    Eagerly loads city models concurrently so the first requests are not stalled by unpickling.
+    Call it before forking worker processes to share the loaded forests copy-on-write.
+    :param cities: Korean ('서울') or English ('seoul') city names. Defaults to all cities.
+    :param max_workers: thread pool size. Defaults to one thread per city.
+    :param compile: also build the compiled forests (see compile_forests)
+    :return: dict {city: {'seconds': float, 'tree_arrays_mb': float, 'error': str or None}}
+             (tree_arrays_mb: estimated size of the tree arrays, see _tree_arrays_nbytes)
+    """
+    if cities is None:
+        city_keys = list(CITY_MAP.values())
+    else:
+        city_keys = [c if c in _city_locks else _resolve_city(c) for c in cities]
+
+    def _timed_load(city_english):
+        start = time.perf_counter()
+        try:
+            model = _load_city_models_by_key(city_english)[0]
+        except FileNotFoundError as e:
+            return {'seconds': time.perf_counter() - start, 'tree_arrays_mb': None, 'error': str(e)}
+        return {'seconds': time.perf_counter() - start, 'tree_arrays_mb': _tree_arrays_nbytes(model) / 1024 ** 2,
+                'error': None}
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers or max(len(city_keys), 1)) as executor:
+        report = dict(zip(city_keys, executor.map(_timed_load, city_keys)))
+    if compile:
+        compile_forests([c for c, info in report.items() if not info['error']])
+    total_seconds = time.perf_counter() - start
+
+    print("--- Model warm-up report ---")
+    for city_english, info in report.items():
+        if info['error']:
+            print(f"- {city_english}: FAILED ({info['error']})")
+        else:
+            print(f"- {city_english}: {info['seconds']:.2f}s, tree arrays ~{info['tree_arrays_mb']:.1f} MB (estimate)")
+    print(f"Total warm-up time: {total_seconds:.2f}s")
+    return report
+
+def _build_model_input(input_data):
+    """
+    사용자 입력(dict)을 모델 학습 형태의 입력(dict)으로 변환합니다.
+    :return: (시/도, 모델 입력 dict)
     """
-    # Load si_code_df if not already loaded
-    si_code_df = _load_si_code_df()
+    # Load the 법정동코드 index if not already loaded
+    bjd_index = _load_bjd_index()
 
     # --- 1. 입력 데이터 변환 ---
     # 모델이 학습한 형태로 입력 데이터를 재구성합니다.
@@ -124,20 +231,15 @@ def predict_price(input_data):
     if not (sido and gu and dong):
         raise ValueError("시/도, 구, 동 정보는 법정동코드 조회를 위해 필수입니다.")
 
-    full_dong_name = f"{sido} {gu} {dong}"
+    full_dong_name = normalize_dong_name(f"{sido} {gu} {dong}")
     
-    # '폐지여부'가 '존재'하는 법정동만 필터링
-    filtered_si_code = si_code_df[(si_code_df['법정동명'] == full_dong_name) & (si_code_df['폐지여부'] == '존재')]
-
-    if filtered_si_code.empty:
+    # '폐지여부'가 '존재'하는 법정동만 인덱싱되어 있음
+    if full_dong_name not in bjd_index['codes']:
         raise ValueError(f"'{full_dong_name}'에 해당하는 법정동코드를 찾을 수 없거나 폐지된 지역입니다. 입력 정보를 확인해주세요.")
-    elif len(filtered_si_code) > 1:
-        # 여러 개가 검색될 경우, 더 구체적인 정보가 필요할 수 있으나, 현재는 첫 번째 항목 사용
-        # 실제 데이터에 따라 이 부분은 더 정교하게 처리될 수 있습니다.
+    if full_dong_name in bjd_index['duplicates']:
+        # 여러 개가 검색될 경우, si_code.csv에서 처음 나온 코드를 사용 (bjd_index.DUPLICATE_POLICY)
         print(f"경고: '{full_dong_name}'에 대해 여러 법정동코드가 발견되었습니다. 첫 번째 코드를 사용합니다.")
-        model_input['법정동코드'] = filtered_si_code.iloc[0]['법정동코드']
-    else:
-        model_input['법정동코드'] = filtered_si_code.iloc[0]['법정동코드']
+    model_input['법정동코드'] = bjd_index['codes'][full_dong_name]
 
     # 필수 입력값 확인 (법정동코드는 이제 동적으로 채워지므로 제외)
     required_fields = ['시군구', '단지명', '전용면적(㎡)', '계약년월', '층', '건축년도', '가계대출_금리']
@@ -147,32 +249,231 @@ def predict_price(input_data):
             if field not in ['본번', '부번']:
                  raise ValueError(f"필수 입력값이 누락되었습니다: {field}")
 
+    return sido, model_input
+
+def _predict_group(city_korean, model_inputs, quantiles=None):
+    """
+    같은 도시의 모델 입력 여러 건을 한 번에 인코딩하고 예측합니다.
+    :param quantiles: 트리별 예측값의 분위수 목록 (예: [0.1, 0.5, 0.9])
+    :return: 예측 가격 배열, quantiles가 있으면 (예측 가격 배열, (행 수, 분위수 수) 배열)
+    """
     # --- 2. 도시별 모델 및 인코더 로드 ---
-    city_korean = input_data.get('시/도', '').strip()
-    if not city_korean:
-        raise ValueError("입력 데이터에 '시/도' 필드가 반드시 포함되어야 합니다.")
-        
-    model, te, ohe, model_columns = _load_city_models(city_korean)
+    model, te, layout, model_columns = _load_city_models(city_korean)
 
     # --- 3. 예측을 위한 데이터프레임 생성 ---
-    df = pd.DataFrame([model_input])
+    # 학습과 같은 숫자 dtype 적용 (문자열 컬럼은 인코더가 값으로 매핑하므로 그대로 둠)
+    df = apply_schema(pd.DataFrame(model_inputs), categories=False)
 
     # --- 4. 인코딩 적용 ---
     # Target Encoding
     df_encoded = te.transform(df)
-    
-    # One-Hot Encoding (해당 도시 모델이 OHE를 사용하는 경우)
-    if ohe:
-        df_encoded = ohe.transform(df_encoded)
 
-    # --- 5. 컬럼 정렬 ---
-    # 학습 시점의 컬럼 순서와 동일하게 맞추고, 없는 컬럼은 0으로 채웁니다.
-    df_aligned = df_encoded.reindex(columns=model_columns, fill_value=0)
+    # --- 5. 모델 입력 구성 ---
+    # 학습 시점의 컬럼 순서대로 CSR 행렬을 만듭니다. 시군구 원-핫은 행마다 해당 컬럼 1개만 채우고,
+    # 없는 컬럼과 학습에 없던 시군구는 0입니다.
+    # get_dummies로 학습한 도시(부산, 대구 등)는 기존과 같이 시군구 컬럼을 모두 0으로 둡니다.
+    X = layout.transform(df_encoded)
 
     # --- 6. 가격 예측 ---
-    prediction = model.predict(df_aligned)
+    return _score(_resolve_city(city_korean), model, X, quantiles)
+
+def _score(city_english, model, X, quantiles=None):
+    """
+    인코딩된 입력 행렬을 예측합니다. (compile_forests로 컴파일된 도시는 CompiledForest 사용)
+    :return: 예측 가격 배열, quantiles가 있으면 (예측 가격 배열, (행 수, 분위수 수) 배열)
+    """
+    forest = _compiled_forests.get(city_english)
+    if quantiles is None:
+        if forest is not None:
+            return forest.predict(X)
+        with warnings.catch_warnings():
+            # DataFrame으로 학습한 모델에 CSR을 넣을 때의 컬럼 이름 경고 (컬럼 순서는 layout이 보장)
+            warnings.filterwarnings('ignore', message='X does not have valid feature names')
+            return np.asarray(model.predict(X), dtype=np.float64)
+
+    # 트리별 예측값을 한 번 계산해 평균(점 추정)과 분위수를 함께 구합니다. (모델 재학습/추가 모델 없음)
+    if forest is not None:
+        tree_values = forest.predict_trees(X)
+    else:
+        tree_values = np.stack([estimator.predict(X) for estimator in model.estimators_])
+    return average_trees(tree_values), tree_quantiles(tree_values, quantiles)
+
+def predict_price(input_data, quantiles=None):
+    """
+    아파트 정보를 입력받아 예상 매매가를 예측하는 함수
+    :param input_data: dict 형태의 아파트 정보
+    :param quantiles: 함께 계산할 트리별 예측값의 분위수 목록 (예: [0.1, 0.5, 0.9])
+    :return: float 형태의 예측 가격 (만원 단위),
+             quantiles가 있으면 (예측 가격, 분위수별 가격 배열)
+    """
+    city_korean, model_input = _build_model_input(input_data)
+    if quantiles is None:
+        return _predict_group(city_korean, [model_input])[0]
+    prices, price_quantiles = _predict_group(city_korean, [model_input], quantiles)
+    return prices[0], price_quantiles[0]
+
+def _predict_chunk(records, quantiles=None):
+    """
+    레코드 목록을 도시별로 묶어 예측합니다. 실패한 행은 NaN과 오류 메시지로 표시합니다.
+    :return: (예측 가격, 오류 메시지 목록), quantiles가 있으면 (예측 가격, 오류 메시지 목록, 분위수 배열)
+    """
+    prices = np.full(len(records), np.nan)
+    errors = [None] * len(records)
+    price_quantiles = None if quantiles is None else np.full((len(records), len(quantiles)), np.nan)
+
+    # 입력 변환 후 도시별로 그룹화
+    groups = {}
+    for i, record in enumerate(records):
+        try:
+            city_korean, model_input = _build_model_input(record)
+            city_english = _resolve_city(city_korean)
+        except (ValueError, TypeError, AttributeError) as e:
+            errors[i] = str(e)
+            continue
+        groups.setdefault(city_english, ([], [], city_korean))
+        groups[city_english][0].append(i)
+        groups[city_english][1].append(model_input)
+
+    # 도시별로 한 번씩 인코딩 및 예측
+    for positions, model_inputs, city_korean in groups.values():
+        try:
+            if quantiles is None:
+                prices[positions] = _predict_group(city_korean, model_inputs)
+            else:
+                prices[positions], price_quantiles[positions] = _predict_group(city_korean, model_inputs, quantiles)
+        except (ValueError, TypeError, AttributeError, FileNotFoundError) as e:
+            for i in positions:
+                errors[i] = str(e)
+    if quantiles is None:
+        return prices, errors
+    return prices, errors, price_quantiles
+
+def iter_predict_prices(records, chunk_size=DEFAULT_CHUNK_SIZE, quantiles=None):
+    """
+    아파트 정보를 chunk_size건씩 나누어 예측합니다. (대용량 또는 스트리밍 입력용)
+    :param records: dict 목록, DataFrame 또는 dict를 생성하는 iterator
+    :param quantiles: 함께 계산할 트리별 예측값의 분위수 목록
+    :return: 청크마다 (예측 가격 배열, 오류 메시지 목록[, 분위수 배열])을 생성하는 generator
+    """
+    if isinstance(records, pd.DataFrame):
+        records = records.to_dict('records')
+
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield _predict_chunk(chunk, quantiles)
+            chunk = []
+    if chunk:
+        yield _predict_chunk(chunk, quantiles)
+
+def predict_prices(records, chunk_size=DEFAULT_CHUNK_SIZE, quantiles=None):
+    """
+    여러 건의 아파트 정보를 한 번에 예측하는 함수
+    - 입력을 도시별로 묶어 도시마다 한 번의 인코딩과 예측으로 처리합니다.
+    :param records: dict 목록, DataFrame 또는 dict를 생성하는 iterator
+    :param quantiles: 함께 계산할 트리별 예측값의 분위수 목록 (예: [0.1, 0.5, 0.9])
+    :return: (예측 가격 배열(만원 단위, 실패 시 NaN), 행별 오류 메시지 목록(성공 시 None)),
+             quantiles가 있으면 (행 수, 분위수 수) 분위수 배열이 세 번째 값으로 추가됩니다.
+    """
+    all_prices, all_errors, all_quantiles = [], [], []
+    for result in iter_predict_prices(records, chunk_size, quantiles):
+        all_prices.append(result[0])
+        all_errors.extend(result[1])
+        if quantiles is not None:
+            all_quantiles.append(result[2])
+    if quantiles is None:
+        if not all_prices:
+            return np.empty(0), []
+        return np.concatenate(all_prices), all_errors
+    if not all_prices:
+        return np.empty(0), [], np.empty((0, len(quantiles)))
+    return np.concatenate(all_prices), all_errors, np.concatenate(all_quantiles)
+
+def predict_scenarios(records, rates, months, quantiles=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    금리/계약년월 스트레스 시나리오 그리드를 한 번에 평가하는 함수
+    - 물건별 정적 피처(위치, 단지, 면적, 층 등)는 도시마다 한 번만 인코딩하고, 시나리오 컬럼
+      (가계대출_금리, 계약년, 계약월)만 바꾼 (물건 수 x 시나리오 수) 입력 행렬을 만들어 한 번에 예측합니다.
+    - 결과는 같은 값으로 predict_price를 시나리오마다 호출한 것과 같습니다.
+    :param records: 물건 정보 dict 목록 또는 DataFrame ('계약년월', '가계대출_금리'는 그리드 값으로 대체)
+    :param rates: 가계대출_금리 목록 (예: [3.0, 3.5, 4.0])
+    :param months: 계약년월(YYYYMM) 목록 (예: [202501, 202601])
+    :param quantiles: 함께 계산할 트리별 예측값의 분위수 목록
+    :param chunk_size: 한 번에 예측할 입력 행 수
+    :return: (예측 가격 배열 [물건, 계약년월, 금리], 물건별 오류 메시지 목록(성공 시 None)),
+             quantiles가 있으면 분위수 배열 [물건, 계약년월, 금리, 분위수]가 세 번째 값으로 추가됩니다.
+    """
+    if isinstance(records, pd.DataFrame):
+        records = records.to_dict('records')
+    records = list(records)
+    rates = np.atleast_1d(np.asarray(rates, dtype=np.float64))
+    months = np.atleast_1d(np.asarray(months, dtype=np.int64))
+    if rates.size == 0 or months.size == 0:
+        raise ValueError("rates와 months에는 하나 이상의 값이 필요합니다.")
+    if ((months % 100 < 1) | (months % 100 > 12)).any():
+        raise ValueError(f"계약년월은 YYYYMM 형식이어야 합니다: {months.tolist()}")
+
+    # 시나리오 순서: 계약년월(바깥) x 금리(안쪽) -> 결과를 (계약년월, 금리)로 reshape
+    scenario_columns = {
+        '가계대출_금리': np.tile(rates, len(months)),
+        '계약년': np.repeat(months // 100, len(rates)),
+        '계약월': np.repeat(months % 100, len(rates)),
+    }
+    n_scenarios = len(months) * len(rates)
+    grid_shape = (len(records), len(months), len(rates))
+
+    prices = np.full((len(records), n_scenarios), np.nan)
+    errors = [None] * len(records)
+    price_quantiles = None if quantiles is None else np.full((len(records), n_scenarios, len(quantiles)), np.nan)
+
+    # 입력 변환 후 도시별로 그룹화 (시나리오 컬럼은 첫 시나리오 값으로 채워 두고 아래에서 교체)
+    groups = {}
+    for i, record in enumerate(records):
+        try:
+            record = {**record, '계약년월': int(months[0]), '가계대출_금리': float(rates[0])}
+            city_korean, model_input = _build_model_input(record)
+            city_english = _resolve_city(city_korean)
+        except (ValueError, TypeError, AttributeError) as e:
+            errors[i] = str(e)
+            continue
+        groups.setdefault(city_english, ([], []))
+        groups[city_english][0].append(i)
+        groups[city_english][1].append(model_input)
+
+    for city_english, (positions, model_inputs) in groups.items():
+        try:
+            model, te, layout, _ = _load_city_models_by_key(city_english)
+
+            # 정적 피처 인코딩 (물건당 한 번)
+            df = apply_schema(pd.DataFrame(model_inputs), categories=False)
+            dense_values, onehot_positions = layout.encode(te.transform(df))
+
+            # 물건마다 시나리오 수만큼 행을 반복하고 시나리오 컬럼만 교체
+            dense_values = np.repeat(dense_values, n_scenarios, axis=0)
+            for col, values in scenario_columns.items():
+                if col in layout.dense_columns:
+                    dense_values[:, layout.dense_columns.index(col)] = np.tile(values, len(positions))
+            X = build_csr(dense_values, layout.dense_positions,
+                          np.repeat(onehot_positions, n_scenarios), layout.n_columns)
+
+            results = [_score(city_english, model, X[start:start + chunk_size], quantiles)
+                       for start in range(0, X.shape[0], chunk_size)]
+        except (ValueError, TypeError, AttributeError, FileNotFoundError) as e:
+            for i in positions:
+                errors[i] = str(e)
+            continue
+
+        if quantiles is None:
+            prices[positions] = np.concatenate(results).reshape(len(positions), n_scenarios)
+        else:
+            prices[positions] = np.concatenate([r[0] for r in results]).reshape(len(positions), n_scenarios)
+            price_quantiles[positions] = np.concatenate([r[1] for r in results]).reshape(
+                len(positions), n_scenarios, len(quantiles))
 
-    return prediction[0]
+    if quantiles is None:
+        return prices.reshape(grid_shape), errors
+    return prices.reshape(grid_shape), errors, price_quantiles.reshape(grid_shape + (len(quantiles),))
 
 if __name__ == '__main__':
     # --- 예측할 아파트 정보 입력 ---
@@ -199,8 +500,8 @@ if __name__ == '__main__':
     }
 
     try:
-        # 함수 호출
-        predicted_price = predict_price(sample_data)
+        # 함수 호출 (점 추정과 트리별 분위수를 함께 계산)
+        predicted_price, price_quantiles = predict_price(sample_data, quantiles=DEFAULT_QUANTILES)
 
         # 결과 출력
         print("--- 입력된 아파트 정보 ---")
@@ -212,6 +513,8 @@ if __name__ == '__main__':
         predicted_price_eok = int(predicted_price / 10000)
         predicted_price_man = int(predicted_price % 10000)
         print(f"==> 예상 매매가: 약 {predicted_price_eok}억 {predicted_price_man}만 원")
+        for q, price in zip(DEFAULT_QUANTILES, price_quantiles):
+            print(f"    P{int(q * 100)}: 약 {int(price / 10000)}억 {int(price % 10000)}만 원")
 
-    except (ValueError, FileNotFoundError) as e:
+    except (ValueError, TypeError, AttributeError, FileNotFoundError) as e:
         print(f"[ERROR] 예측 중 오류가 발생했습니다: {e}")
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Location column that is one-hot encoded (as '시군구_<value>' columns, the get_dummies naming)
+ONEHOT_COLUMN = '시군구'
+
+def build_csr(dense_values, dense_positions, onehot_positions, n_columns):
+    """
+    Builds a CSR model input from the dense columns and one one-hot entry per row,
+    without materializing the dense one-hot block.
+    :param dense_values: (n, d) array of the non one-hot columns
+    :param dense_positions: (d,) model column positions of those columns
+    :param onehot_positions: (n,) model column position of each row's one-hot entry (-1: none/unknown)
+    :param n_columns: total number of model columns
+    """
+    dense_values = np.asarray(dense_values, dtype=np.float32)
+    n, d = dense_values.shape
+    has_onehot = onehot_positions >= 0
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(d + has_onehot, out=indptr[1:])
+    indices = np.empty(indptr[-1], dtype=np.int32)
+    data = np.empty(indptr[-1], dtype=np.float32)
+
+    row_start = indptr[:-1]
+    dense_slots = (row_start[:, None] + np.arange(d)).ravel()
+    indices[dense_slots] = np.tile(np.asarray(dense_positions, dtype=np.int32), n)
+    data[dense_slots] = dense_values.ravel()
+    onehot_slots = row_start[has_onehot] + d
+    indices[onehot_slots] = onehot_positions[has_onehot]
+    data[onehot_slots] = 1.0
+
+    X = sparse.csr_matrix((data, indices, indptr), shape=(n, n_columns))
+    X.sort_indices()
+    X.eliminate_zeros()
+    return X
+
+class ColumnLayout:
+    """
+    Positions of the dense and one-hot columns in a saved model_columns list.
+    Works for models trained with pd.get_dummies, category_encoders' OneHotEncoder(use_cat_names=True)
+    or SparseOneHotEncoder, which all name the columns '<col>_<value>'.
+    With set_onehot=False the '<col>_<value>' columns are left at 0, which is how predict_apt has
+    always fed the get_dummies models (their one-hot columns were never filled at prediction time).
+    """
+
+    def __init__(self, model_columns, col=ONEHOT_COLUMN, set_onehot=True):
+        prefix = f'{col}_'
+        self.col = col
+        self.set_onehot = set_onehot
+        self.n_columns = len(model_columns)
+        self.dense_columns = [c for c in model_columns if not str(c).startswith(prefix)]
+        self.dense_positions = np.array(
+            [i for i, c in enumerate(model_columns) if not str(c).startswith(prefix)], dtype=np.int32)
+        self.onehot_positions = {
+            str(c)[len(prefix):]: i for i, c in enumerate(model_columns) if str(c).startswith(prefix)
+        }
+
+    def encode(self, df):
+        """
+        df (target-encoded, with the raw location column) -> (dense values (n, d), one-hot positions (n,)),
+        the inputs of build_csr. Unknown locations (and every row when set_onehot is False) get
+        position -1 (no one-hot entry).
+        """
+        # astype (rather than to_numpy(dtype)) turns None in object columns into NaN
+        dense_values = df.reindex(columns=self.dense_columns, fill_value=0).astype(np.float32).to_numpy()
+        if not self.set_onehot:
+            return dense_values, np.full(len(df), -1, dtype=np.int64)
+        positions = df[self.col].astype(object).map(self.onehot_positions).fillna(-1).to_numpy(dtype=np.int64)
+        return dense_values, positions
+
+    def transform(self, df):
+        """df (target-encoded, with the raw location column) -> CSR model input."""
+        dense_values, positions = self.encode(df)
+        return build_csr(dense_values, self.dense_positions, positions, self.n_columns)
+
+class SparseOneHotEncoder:
+    """
+    One-hot encodes the location column into CSR next to the other (already numeric) columns.
+    Column order matches pd.get_dummies: the other columns, then '<col>_<value>' in sorted order.
+    """
+
+    def __init__(self, col=ONEHOT_COLUMN):
+        self.col = col
+
+    def fit(self, X):
+        categories = sorted(pd.unique(X[self.col].dropna().astype(object)))
+        dense_columns = [c for c in X.columns if c != self.col]
+        self.feature_names_ = dense_columns + [f'{self.col}_{c}' for c in categories]
+        self.layout_ = ColumnLayout(self.feature_names_, self.col)
+        return self
+
+    def transform(self, X):
+        return self.layout_.transform(X)
+
+    def fit_transform(self, X):
+        return self.fit(X).transform(X)
@@ -0,0 +1,94 @@
+"""
+price_ewma_3 피처 벤치마크
+- 기존 groupby().transform(lambda ...) 방식과 train_aptsales.price_ewma의
+  결과 일치 여부(완전 일치)와 실행 시간을 비교합니다.
+- 서울 데이터가 없으면 비슷한 형태의 합성 데이터를 사용합니다.
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from table_cache import read_table
+from train_aptsales import CITY_CONFIGS, DEFAULT_CONFIG, price_ewma
+
+CITY = 'seoul'
+N_SYNTHETIC_ROWS = 1000000
+N_SYNTHETIC_COMPLEXES = 40000
+N_REPEAT = 3
+RANDOM_STATE = 42
+REQUIRED_COLUMNS = ['단지명', '전용면적(㎡)', '계약년월', '거래금액(만원)']
+
+def reference_ewma(df):
+    """학습 스크립트의 기존 구현 (그룹마다 lambda 호출)"""
+    ewma = df.groupby(['단지명', '면적구간'], observed=False)['거래금액(만원)'].transform(
+        lambda x: x.shift(1).ewm(span=3, adjust=False).mean()
+    )
+    ewma = ewma.groupby([df['단지명'], df['면적구간']], observed=False).transform(lambda x: x.bfill())
+    return ewma.fillna(0)
+
+def make_synthetic_data(n=N_SYNTHETIC_ROWS, n_complexes=N_SYNTHETIC_COMPLEXES, seed=RANDOM_STATE):
+    rng = np.random.default_rng(seed)
+    complexes = np.array([f"단지{i}" for i in range(n_complexes)], dtype=object)
+    df = pd.DataFrame({
+        '단지명': complexes[rng.zipf(1.3, n) % n_complexes],
+        '전용면적(㎡)': rng.uniform(20, 200, n).round(2),
+        '계약년월': rng.integers(2015, 2025, n) * 100 + rng.integers(1, 13, n),
+        '거래금액(만원)': rng.integers(5000, 300000, n),
+    })
+    df.loc[rng.random(n) < 0.001, '단지명'] = np.nan
+    return df, '%Y%m'
+
+def load_data():
+    """서울 매매 데이터를 불러오고, 없으면 합성 데이터를 사용합니다."""
+    config = {**DEFAULT_CONFIG, **CITY_CONFIGS[CITY]}
+    path = os.path.join(config['data_dir'], config['data_file'])
+    try:
+        df = read_table(path, encoding='utf-8')
+        if all(c in df.columns for c in REQUIRED_COLUMNS):
+            print(f"[INFO] 실제 데이터 사용: {path}")
+            df['거래금액(만원)'] = df['거래금액(만원)'].astype(str).str.replace(',', '').astype(int)
+            return df[REQUIRED_COLUMNS].copy(), config['date_format']
+    except (FileNotFoundError, pd.errors.ParserError):
+        pass
+    print(f"[INFO] 실제 데이터를 찾을 수 없어 합성 데이터 {N_SYNTHETIC_ROWS}건을 사용합니다.")
+    return make_synthetic_data()
+
+def prepare(df, date_format):
+    """create_time_series_features의 EWMA 직전 단계 (면적구간, 정렬)"""
+    bins = [0, 60, 85, 135, float('inf')]
+    labels = ['소형', '중형', '대형', '초대형']
+    df['면적구간'] = pd.cut(df['전용면적(㎡)'], bins=bins, labels=labels, right=False)
+    df['계약년월'] = pd.to_datetime(df['계약년월'], format=date_format)
+    return df.sort_values(by=['단지명', '면적구간', '계약년월']).reset_index(drop=True)
+
+def best_time(func, df):
+    best, result = float("inf"), None
+    for _ in range(N_REPEAT):
+        start = time.perf_counter()
+        result = func(df)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    df = prepare(*load_data())
+    n_groups = df.groupby(['단지명', '면적구간'], observed=True).ngroups
+    print(f"[INFO] 행 수: {len(df)}, 그룹 수: {n_groups}")
+
+    t_old, old = best_time(reference_ewma, df)
+    t_new, new = best_time(price_ewma, df)
+
+    print("\n--- price_ewma_3 벤치마크 ---")
+    print(f"기존 (transform + lambda): {t_old:,.2f} s")
+    print(f"벡터화 (groupby ewm):      {t_new:,.2f} s")
+    print(f"속도 향상:                 {t_old / t_new:.1f}x")
+    mismatch = old.to_numpy() != new.to_numpy()
+    if mismatch.any():
+        print(f"[오류] 결과 불일치 {mismatch.sum()}건")
+        print(pd.DataFrame({'old': old[mismatch], 'new': new[mismatch]}).head(20))
+        sys.exit(1)
+    print("결과 일치: 모든 값이 동일합니다.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+원본 데이터 파일(csv, xlsx)을 한 번만 파싱하고 컬럼형 캐시 파일로 재사용하는 로더
+- 캐시 키: 파일 내용 해시 + 읽기 옵션 + TABLE_CACHE_VERSION (파일이 바뀌면 자동으로 다시 변환)
+- 캐시 형식: pyarrow가 있으면 Feather, 없으면 pickle
+- xlsx는 python-calamine이 설치되어 있으면 사용하고, 없으면 openpyxl로 읽습니다.
+  (두 경우 모두 pd.read_excel과 같은 TextParser로 빈 셀/타입을 처리하고, 엔진 이름도 캐시 키에 포함)
+"""
+import os
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from pandas.io.parsers import TextParser
+
+try:
+    import pyarrow.feather as _feather
+except ImportError: # pyarrow가 없으면 pickle 형식으로 캐시
+    _feather = None
+
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError: # python-calamine이 없으면 openpyxl 사용
+    CalamineWorkbook = None
+
+TABLE_CACHE_VERSION = 2
+CACHE_DIR_NAME = "table_cache"   # 원본 파일과 같은 폴더 아래에 생성
+XLSX_ENGINE = "openpyxl" if CalamineWorkbook is None else "calamine"
+XLSX_EXTENSIONS = (".xlsx", ".xls")
+
+def file_key(path, **read_kwargs):
+    """파일 내용과 읽기 옵션으로 캐시 키를 만듭니다."""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    if path.lower().endswith(XLSX_EXTENSIONS):
+        # 엔진마다 변환 결과가 다를 수 있으므로 캐시를 엔진별로 구분
+        read_kwargs = {**read_kwargs, "_engine": XLSX_ENGINE}
+    h.update(json.dumps(read_kwargs, sort_keys=True, default=str).encode("utf-8"))
+    h.update(f"v{TABLE_CACHE_VERSION}".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+def _read_xlsx(path):
+    if CalamineWorkbook is None:
+        return pd.read_excel(path, engine='openpyxl')
+    rows = CalamineWorkbook.from_path(path).get_sheet_by_index(0).to_python()
+    if not rows:
+        return pd.DataFrame()
+    # read_excel과 같은 파서: 빈 셀('')은 NaN, 컬럼 타입은 pandas가 추론
+    return TextParser(rows, header=0).read()
+
+def _read_source(path, **read_kwargs):
+    if path.lower().endswith(XLSX_EXTENSIONS):
+        return _read_xlsx(path)
+    return pd.read_csv(path, **read_kwargs)
+
+def _write_cache(df, cache_base):
+    """Feather로 저장하고, 타입이 섞인 컬럼 등으로 실패하면 pickle로 저장합니다."""
+    df = df.reset_index(drop=True)
+    if _feather is not None:
+        try:
+            _feather.write_feather(df, cache_base + ".feather.tmp")
+            os.replace(cache_base + ".feather.tmp", cache_base + ".feather")
+            return
+        except Exception:
+            if os.path.exists(cache_base + ".feather.tmp"):
+                os.remove(cache_base + ".feather.tmp")
+    df.to_pickle(cache_base + ".pkl.tmp")
+    os.replace(cache_base + ".pkl.tmp", cache_base + ".pkl")
+
+def _read_cache(cache_base):
+    if _feather is not None and os.path.exists(cache_base + ".feather"):
+        return _feather.read_table(cache_base + ".feather", memory_map=True).to_pandas()
+    if os.path.exists(cache_base + ".pkl"):
+        return pd.read_pickle(cache_base + ".pkl")
+    return None
+
+def read_table(path, cache_dir=None, **read_kwargs):
+    """
+    csv/xlsx 파일을 캐시를 거쳐 DataFrame으로 읽습니다.
+    :param cache_dir: 캐시 폴더 (기본값: 원본 파일 폴더의 table_cache). False이면 캐시를 사용하지 않습니다.
+    :param read_kwargs: pd.read_csv에 전달할 옵션 (예: encoding)
+    """
+    if cache_dir is False:
+        return _read_source(path, **read_kwargs)
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+    name = os.path.splitext(os.path.basename(path))[0]
+    cache_base = os.path.join(cache_dir, f"{name}_{file_key(path, **read_kwargs)}")
+
+    df = _read_cache(cache_base)
+    if df is not None:
+        return df
+
+    df = _read_source(path, **read_kwargs)
+    os.makedirs(cache_dir, exist_ok=True)
+    _write_cache(df, cache_base)
+    return df
+
+def _read_table_task(args):
+    path, cache_dir, read_kwargs = args
+    return read_table(path, cache_dir=cache_dir, **read_kwargs)
+
+def read_tables(paths, max_workers=None, cache_dir=None, **read_kwargs):
+    """
+    여러 파일을 프로세스 풀에서 동시에 읽습니다. (결과 순서는 paths 순서와 같음)
+    :param max_workers: 프로세스 수 (기본값: CPU 코어 수와 파일 수 중 작은 값)
+    """
+    paths = list(paths)
+    if len(paths) <= 1:
+        return [read_table(p, cache_dir=cache_dir, **read_kwargs) for p in paths]
+    max_workers = max_workers or min(len(paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_read_table_task, [(p, cache_dir, read_kwargs) for p in paths]))
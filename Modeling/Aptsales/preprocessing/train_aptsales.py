@@ -0,0 +1,246 @@
+import pandas as pd
+import time
+import joblib
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from sklearn.ensemble import RandomForestRegressor
+from category_encoders import TargetEncoder, OneHotEncoder
+from table_cache import read_table
+
+# --- 0. 최종 모델 훈련 스크립트 ---
+# 도시별 전체 데이터를 사용하여 최종 모델을 훈련하고 predict_model/ 에 저장합니다.
+# 사용법: python train_aptsales.py [seoul busan ...] [--jobs N] [--cores-per-city K] [--encoding sparse]
+
+_script_dir = os.path.dirname(os.path.abspath(__file__))
+
+# 학습/예측 공통 dtype 스키마 (predict_apt와 공유)
+sys.path.append(os.path.join(_script_dir, '..', 'predict_model'))
+from apt_schema import apply_schema, memory_report
+from sparse_encoding import SparseOneHotEncoder
+
+# 공통 설정 (도시별 설정과 train_city의 config 인자로 덮어쓸 수 있음)
+DEFAULT_CONFIG = {
+    'data_dir': os.path.join(_script_dir, '..', 'data'),
+    'model_dir': os.path.join(_script_dir, '..', 'predict_model'),
+    'date_format': 'mixed',
+    # 'onehot': category_encoders OneHotEncoder, 'dummies': pd.get_dummies,
+    # 'sparse': 시군구 원-핫을 CSR로 학습 (get_dummies 컬럼 순서, 메모리는 줄지만 학습이 약 3.4배 느림, --encoding으로 선택)
+    'encoding': 'dummies',
+    'n_estimators': 100,
+    'random_state': 42,
+    'n_jobs': -1,                 # RandomForest 학습에 사용할 코어 수
+}
+
+# 도시별 설정 (키는 predict_apt.CITY_MAP의 영문 이름)
+CITY_CONFIGS = {
+    'seoul':    {'data_file': '서울_매매_합본.csv', 'date_format': '%Y%m', 'encoding': 'onehot'},
+    'busan':    {'data_file': '부산_매매_합본.csv'},
+    'daegu':    {'data_file': '대구_매매_합본.csv'},
+    'incheon':  {'data_file': '인천_매매_합본.csv', 'encoding': 'onehot'},
+    'gwangju':  {'data_file': '광주_매매_합본.csv'},
+    'daejeon':  {'data_file': '대전_매매_합본.csv'},
+    'ulsan':    {'data_file': '울산_매매_합본.csv'},
+    'gyeonggi': {'data_file': '경기_매매_합본.csv'},
+}
+
+def resolve_config(city, config=None):
+    """공통 설정 <- 도시별 설정 <- config 순서로 합친 설정을 반환합니다."""
+    if city not in CITY_CONFIGS:
+        raise ValueError(f"Unsupported city: {city}. Choose from {list(CITY_CONFIGS)}.")
+    return {**DEFAULT_CONFIG, **CITY_CONFIGS[city], **(config or {})}
+
+def create_time_series_features(df, date_format='mixed'):
+    """단지명과 면적구간으로 그룹화하여 시계열 피처를 생성합니다."""
+    print("\n[INFO] Creating area groups and time-series features...")
+    # 면적구간 피처 생성
+    bins = [0, 60, 85, 135, float('inf')]
+    labels = ['소형', '중형', '대형', '초대형']
+    df['면적구간'] = pd.cut(df['전용면적(㎡)'], bins=bins, labels=labels, right=False)
+
+    if '계약년월' not in df.columns:
+        print("[WARNING] '계약년월' column not found. Skipping time-series features.")
+        return df
+
+    df['계약년월'] = pd.to_datetime(df['계약년월'], format=date_format)
+    df['계약년'] = df['계약년월'].dt.year
+    df['계약월'] = df['계약년월'].dt.month
+
+    df = df.sort_values(by=['단지명', '면적구간', '계약년월']).reset_index(drop=True)
+
+    # EWMA 피처 (그룹화 기준 변경)
+    df['price_ewma_3'] = price_ewma(df, span=3)
+
+    print("[INFO] Feature creation complete.")
+    return df
+
+def price_ewma(df, span=3, keys=('단지명', '면적구간')):
+    """
+    (단지명, 면적구간) 그룹별로 직전 거래까지의 거래금액 EWMA를 계산합니다.
+    - 그룹별 shift(1) -> ewm(span, adjust=False).mean() -> 그룹 내 bfill -> 남은 결측치 0
+    - groupby().shift / ewm / bfill을 그룹 전체에 한 번씩 적용 (그룹마다 Python 함수를 호출하지 않음)
+    :param df: keys와 계약년월 순으로 정렬된 DataFrame
+    :return: df와 같은 인덱스의 Series
+    """
+    keys = list(keys)
+    grouped = df.groupby(keys, observed=True, sort=False)
+    shifted = grouped['거래금액(만원)'].shift(1)
+
+    ewma = (shifted.groupby([df[k] for k in keys], observed=True, sort=False)
+            .ewm(span=span, adjust=False).mean()
+            .droplevel(list(range(len(keys))))
+            .reindex(df.index))
+
+    # 그룹 첫 거래(직전 거래 없음)는 같은 그룹의 다음 값으로 채움
+    ewma = ewma.groupby([df[k] for k in keys], observed=True, sort=False).bfill()
+    return ewma.fillna(0)
+
+def train_final_model(df, config):
+    """
+    전체 데이터를 사용하여 최종 모델을 훈련합니다.
+    :return: (모델, TargetEncoder, OneHotEncoder 또는 None, 모델 입력 컬럼)
+    """
+    print(f"\n--- Starting Final Model Training (Data size: {len(df)}) ---")
+
+    # --- 전체 데이터를 훈련에 사용 ---
+    y_train = df['거래금액(만원)']
+    cols_to_drop = ['NO', '거래금액(만원)', '계약년월']
+    X_train = df.drop(cols_to_drop, axis=1)
+
+    # --- 인코딩 ---
+    print("[INFO] Applying encoders to the entire dataset...")
+    te = TargetEncoder(cols=['단지명', '면적구간'])
+    X_train_encoded = te.fit_transform(X_train, y_train)
+
+    ohe = None
+    if config['encoding'] == 'sparse':
+        # 시군구 원-핫을 CSR로 구성 (행마다 1개만 0이 아님, 밀집 더미 컬럼을 만들지 않음)
+        ohe = SparseOneHotEncoder(col='시군구')
+        X_train_final = ohe.fit_transform(X_train_encoded)
+        columns = pd.Index(ohe.feature_names_)
+        print(f"[INFO] Sparse input: {X_train_final.shape[1]} columns, {X_train_final.nnz} non-zeros "
+              f"({X_train_final.data.nbytes / 1024 ** 2:.1f} MB)")
+    else:
+        if config['encoding'] == 'onehot':
+            ohe = OneHotEncoder(cols=['시군구'], use_cat_names=True)
+            X_train_encoded = ohe.fit_transform(X_train_encoded)
+        else:
+            X_train_encoded = pd.get_dummies(X_train_encoded, columns=['시군구'], prefix='시군구')
+        X_train_final = X_train_encoded
+        columns = X_train_final.columns
+
+    # --- 최종 모델(RandomForest) 훈련 ---
+    print(f"[INFO] Training the final RandomForest model on the entire dataset (n_jobs={config['n_jobs']})...")
+    start_time = time.time()
+
+    final_model = RandomForestRegressor(
+        n_estimators=config['n_estimators'], random_state=config['random_state'], n_jobs=config['n_jobs']
+    )
+    final_model.fit(X_train_final, y_train)
+
+    end_time = time.time()
+    print(f"[INFO] Final model training complete. Time taken: {end_time - start_time:.2f} seconds.")
+
+    return final_model, te, ohe, columns
+
+def save_artifacts(city, model_dir, final_model, te, ohe, columns):
+    """predict_apt가 불러오는 이름으로 모델과 전처리기를 저장합니다."""
+    os.makedirs(model_dir, exist_ok=True)
+    joblib.dump(final_model, os.path.join(model_dir, f'rf_model_{city}.joblib'))
+    joblib.dump(te, os.path.join(model_dir, f'target_encoder_{city}.joblib'))
+    ohe_path = os.path.join(model_dir, f'onehot_encoder_{city}.joblib')
+    if ohe is not None:
+        joblib.dump(ohe, ohe_path)
+    elif os.path.exists(ohe_path):
+        # predict_apt는 이 파일이 있는 도시만 시군구 원-핫을 채우므로, 이전 학습의 파일을 지웁니다.
+        os.remove(ohe_path)
+    joblib.dump(columns, os.path.join(model_dir, f'model_columns_{city}.joblib'))
+
+def train_city(city, config=None):
+    """
+    한 도시의 데이터를 불러와 최종 모델을 훈련하고 저장합니다.
+    :param city: 영문 도시 이름 (예: 'seoul')
+    :param config: DEFAULT_CONFIG / CITY_CONFIGS 값을 덮어쓸 설정 (예: {'n_jobs': 4})
+    :return: dict (city, rows, seconds, memory_mb)
+    """
+    config = resolve_config(city, config)
+    start_time = time.time()
+
+    # --- 1. 데이터 로드 및 전처리 ---
+    data_path = os.path.join(config['data_dir'], config['data_file'])
+    try:
+        df_original = read_table(data_path, encoding='utf-8')  # 변환 결과를 캐시하여 재사용
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Data file not found at: {data_path}. Please ensure it exists.")
+
+    df_original['거래금액(만원)'] = df_original['거래금액(만원)'].astype(str).str.replace(',', '').astype(int)
+    df_original['가계대출_금리'] = df_original['가계대출_금리'].fillna(df_original['가계대출_금리'].mean())
+
+    # 반복 문자열은 category, 숫자는 16/32비트 타입으로 변환
+    memory_before = df_original.memory_usage(deep=True)
+    df_original = apply_schema(df_original)
+    report = memory_report(memory_before, df_original)
+    print(f"[INFO] Memory usage ({city}): {report.loc['total', 'before_mb']:.1f} MB -> "
+          f"{report.loc['total', 'after_mb']:.1f} MB ({report.loc['total', 'ratio']:.0%})")
+
+    # 시계열 피처 생성
+    df_with_features = apply_schema(create_time_series_features(df_original, config['date_format']))
+
+    # --- 2. 최종 모델 훈련 실행 ---
+    final_model, te, ohe, columns = train_final_model(df_with_features, config)
+
+    # --- 3. 최종 모델 및 전처리기 저장 ---
+    print(f'\n--- Saving final model and encoders for {city}... ---')
+    save_artifacts(city, config['model_dir'], final_model, te, ohe, columns)
+    print(f'\n--- Final model and encoders for {city} have been saved successfully. ---')
+
+    return {'city': city, 'rows': len(df_with_features), 'seconds': time.time() - start_time,
+            'memory_mb': report.loc['total', 'after_mb']}
+
+def train_cities(cities, jobs=None, cores_per_city=None, config=None):
+    """
+    여러 도시를 프로세스 풀에서 동시에 훈련합니다.
+    :param jobs: 동시에 훈련할 도시 수 (기본값: 도시 수와 CPU 코어 수 중 작은 값)
+    :param cores_per_city: 도시마다 RandomForest에 배정할 코어 수 (기본값: CPU 코어 수 / jobs)
+    :return: {city: 결과 dict 또는 오류 메시지}
+    """
+    n_cpus = os.cpu_count() or 1
+    jobs = max(1, min(jobs or n_cpus, len(cities)))
+    cores_per_city = cores_per_city or max(1, n_cpus // jobs)
+    city_config = {**(config or {}), 'n_jobs': cores_per_city}
+    print(f"[INFO] Training {len(cities)} cities with {jobs} processes x {cores_per_city} cores.")
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        futures = {executor.submit(train_city, city, city_config): city for city in cities}
+        for future in as_completed(futures):
+            city = futures[future]
+            try:
+                results[city] = future.result()
+            except Exception as e:
+                results[city] = f"{type(e).__name__}: {e}"
+
+    print("\n--- Training summary ---")
+    for city in cities:
+        result = results[city]
+        if isinstance(result, dict):
+            print(f"- {city}: {result['rows']} rows, {result['memory_mb']:.1f} MB, {result['seconds']:.1f}s")
+        else:
+            print(f"- {city}: FAILED ({result})")
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the Aptsales RandomForest models per city.")
+    parser.add_argument('cities', nargs='*', help=f"cities to train (default: all of {list(CITY_CONFIGS)})")
+    parser.add_argument('--jobs', type=int, default=None, help="cities trained concurrently")
+    parser.add_argument('--cores-per-city', type=int, default=None, help="RandomForest n_jobs per city")
+    parser.add_argument('--encoding', choices=['dummies', 'onehot', 'sparse'], default=None,
+                        help="시군구 encoding for every selected city (default: per-city setting)")
+    args = parser.parse_args()
+    unknown = [c for c in args.cities if c not in CITY_CONFIGS]
+    if unknown:
+        parser.error(f"unsupported cities: {unknown}")
+
+    train_cities(args.cities or list(CITY_CONFIGS), jobs=args.jobs, cores_per_city=args.cores_per_city,
+                 config={'encoding': args.encoding} if args.encoding else None)
@@ -1,8 +1,15 @@
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
 import pandas as pd
 import time
 import re
 import os
+import queue
+import sqlite3
+import sys
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
 # Selenium imports
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
@@ -10,78 +17,171 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException, StaleElementReferenceException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException, StaleElementReferenceException, WebDriverException
 
-def parse_page(html):
-    soup = BeautifulSoup(html, "html.parser")
-    data_list = []
+from html_archive import ARCHIVE_DIR, HtmlArchive, read_record
+
+# pyarrow is optional; without it the combined re-parse output is written as CSV
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+# --- Crawl Settings ---
+PAGE_STEP = 60            # page offset increment of the search results
+NUM_WORKERS = 4           # concurrent browser workers
+MAX_RETRIES = 3           # attempts per page before it is marked as failed
+RETRY_BACKOFF = 2.0       # seconds; doubled on every retry
+PAGE_DELAY = 1.0          # politeness delay after each page, per worker
+MANIFEST_FILE = "crawl_manifest.sqlite"
+PAGE_LOAD_TIMEOUT = 20    # seconds to wait for the result list (or the no-results marker)
+RESULT_LIST_SELECTOR = "a.search_list"
+# Class of the element the site shows instead of the list once a page is past the last result.
+# Only a page carrying this marker ends a state's crawl. It is unset until it has been confirmed
+# against a saved real page (see has_no_results_marker and the html_archive); while unset, a page
+# without listings is retried and recorded as failed, never as the end of the state.
+NO_RESULTS_CLASS = None
+
+# --- Re-parse Settings ---
+REPARSE_CHUNK = 200       # archived pages per re-parse task
+COMBINED_OUTPUT = "auction_data_reparsed"   # .parquet (or .csv without pyarrow)
+
+def _class_xpath(*classes, root=".//*"):
+    """Compiles an XPath equivalent to a CSS class selector (e.g. '.price.low')."""
+    conditions = " and ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {c} ')" for c in classes
+    )
+    return etree.XPath(f"{root}[{conditions}]")
+
+# Compiled selectors and patterns used by parse_page
+_ITEMS = _class_xpath("search_list", root="//a")
+_ADDRESS = _class_xpath("list_text_addr")
+_AREA = _class_xpath("list_area_wrapper")
+_SPECIAL = _class_xpath("mul_special_right_wrapper")
+_PRICE = _class_xpath("price")
+_MIN_PRICE = _class_xpath("price", "low")
+_WIN_PRICE = _class_xpath("price", "sold")
+_STATUS = _class_xpath("state")
+_SALE_DATE = _class_xpath("date")
+_UCHAL = _class_xpath("uchal")
+_TEXT_NODES = etree.XPath(".//text()")
+
+BUILDING_AREA_PATTERN = re.compile(r"건물\s*([\d,.]+)")
+LAND_AREA_PATTERN = re.compile(r"토지\s*([\d,.]+)")
+DIGITS_PATTERN = re.compile(r"\d+")
+
+def _first(selector, element):
+    found = selector(element)
+    return found[0] if found else None
+
+def _get_text(element, strip=False):
+    """Same result as BeautifulSoup's Tag.get_text() / get_text(strip=True)."""
+    texts = _TEXT_NODES(element)
+    if strip:
+        return "".join(t.strip() for t in texts if t.strip())
+    return "".join(texts)
+
+def has_no_results_marker(html, no_results_class=NO_RESULTS_CLASS):
+    """True when the page carries the site's no-results marker (never true while the marker is unset)."""
+    if not no_results_class:
+        return False
+    try:
+        tree = lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return False
+    return bool(_class_xpath(no_results_class)(tree))
+
+def _rejoin_split_items(items):
+    """
+    libxml2 closes an <a> as soon as a <table> starts inside it (html.parser keeps the nesting),
+    which leaves the rest of a listing as siblings after its anchor. Moves those siblings back
+    into the anchor, up to the next listing, so the selectors see the same content as with bs4.
+    """
+    anchors = set(items)
+    for item in items:
+        sibling = item.getnext()
+        if sibling is None or sibling.tag != "table":
+            continue
+        if item.tail:  # text between the anchor and the table belonged to the listing
+            if len(item):
+                item[-1].tail = (item[-1].tail or "") + item.tail
+            else:
+                item.text = (item.text or "") + item.tail
+            item.tail = None
+        while sibling is not None and sibling not in anchors:
+            next_sibling = sibling.getnext()
+            item.append(sibling)
+            sibling = next_sibling
 
-    items = soup.select("a.search_list")
-    print(f"Found {len(items)} items to parse.")
+def parse_page(html, strict=False):
+    """
+    Parses the listings of a search results page (lxml + compiled XPath selectors).
+    An empty or non-HTML page source gives [], or raises with strict=True (used by the crawler,
+    which must not mistake a broken page for the end of the results).
+    """
+    try:
+        tree = lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        if strict:
+            raise
+        return []
+    data_list = []
+    items = _ITEMS(tree)
+    _rejoin_split_items(items)
 
     for item in items:
         try:
             # 소재지
-            address_element = item.select_one(".list_text_addr")
-            address = address_element.get_text(strip=True) if address_element else "N/A"
+            address_element = _first(_ADDRESS, item)
+            address = _get_text(address_element, strip=True) if address_element is not None else "N/A"
             
             # 면적
-            area_element = item.select_one(".list_area_wrapper")
-            area = ' '.join(area_element.get_text().split()) if area_element else ""
+            area_element = _first(_AREA, item)
+            area = ' '.join(_get_text(area_element).split()) if area_element is not None else ""
             
-            building_area_match = re.search(r"건물\s*([\d,.]+)", area)
-            if building_area_match:
-                building_area = building_area_match.group(1).replace(',', '')
-            else:
-                building_area = "N/A"
+            building_area_match = BUILDING_AREA_PATTERN.search(area)
+            building_area = building_area_match.group(1).replace(',', '') if building_area_match else "N/A"
 
-            land_area_match = re.search(r"토지\s*([\d,.]+)", area)
-            if land_area_match:
-                land_area = land_area_match.group(1).replace(',', '')
-            else:
-                land_area = "N/A"
+            land_area_match = LAND_AREA_PATTERN.search(area)
+            land_area = land_area_match.group(1).replace(',', '') if land_area_match else "N/A"
             
             # 기타 정보
-            special_element = item.select_one(".mul_special_right_wrapper")
-            special = special_element.get_text().split() if special_element else "N/A"
+            special_element = _first(_SPECIAL, item)
+            special = _get_text(special_element).split() if special_element is not None else "N/A"
 
             #감정가
-            price_element = item.select_one(".price")
-            price = price_element.get_text(strip=True) if price_element else "N/A"
+            price_element = _first(_PRICE, item)
+            price = _get_text(price_element, strip=True) if price_element is not None else "N/A"
 
             # 최저가
-            min_price_element = item.select_one(".price.low")
-            min_price_text = min_price_element.get_text(strip=True) if min_price_element else "N/A"
+            min_price_element = _first(_MIN_PRICE, item)
+            min_price_text = _get_text(min_price_element, strip=True) if min_price_element is not None else "N/A"
             if min_price_text != "N/A":
                 min_price = min_price_text.replace('최', '').replace('원', '').replace(',', '')
             else:
                 min_price = None
 
             # 낙찰가
-            win_price_element = item.select_one(".price.sold")
-            win_price_text = win_price_element.get_text(strip=True) if win_price_element else "N/A"
+            win_price_element = _first(_WIN_PRICE, item)
+            win_price_text = _get_text(win_price_element, strip=True) if win_price_element is not None else "N/A"
             if win_price_text != "N/A":
                 win_price = win_price_text.replace('낙', '').replace('원', '').replace(',', '')
             else:
                 win_price = None
 
             # 진행상태
-            status_element = item.select_one(".state")
-            status = status_element.get_text(strip=True) if status_element else "N/A"
+            status_element = _first(_STATUS, item)
+            status = _get_text(status_element, strip=True) if status_element is not None else "N/A"
 
             # 매각기일
-            sale_date_element = item.select_one(".date")
-            sale_date = sale_date_element.get_text(strip=True) if sale_date_element else "N/A"
+            sale_date_element = _first(_SALE_DATE, item)
+            sale_date = _get_text(sale_date_element, strip=True) if sale_date_element is not None else "N/A"
             
             # 유찰횟수
-            uchal_element = item.select_one(".uchal")
-            uchal_text = uchal_element.get_text(strip=True) if uchal_element else "N/A"
-            uchal_match = re.search(r'\d+', uchal_text)
-            if uchal_match:
-                ucal = int(uchal_match.group(0))
-            else:
-                ucal = "N/A"
-            
+            uchal_element = _first(_UCHAL, item)
+            uchal_text = _get_text(uchal_element, strip=True) if uchal_element is not None else "N/A"
+            uchal_match = DIGITS_PATTERN.search(uchal_text)
+            ucal = int(uchal_match.group(0)) if uchal_match else "N/A"
             
             data_list.append({
                 "소재지": address,
@@ -100,125 +200,361 @@ def parse_page(html):
             print(f"⚠️ Error parsing an item: {e}")
             continue
     
-    print(f"Successfully parsed {len(data_list)} items.")
-    print("--- Sample Parsed Data (first 5) ---")
-    for d in data_list[:15]:
-        print(d)
     return data_list
 
 
-# --- Main Execution ---
-def scrape_by_state(state_code, max_page, start_page=0):
+# --- Crawl Manifest ---
+class CrawlManifest:
     """
-    Crawls auction data for a specific state code, from a start page up to a maximum page number.
-    
-    Args:
-        state_code (int): The state code to filter by (e.g., 40, 50).
-        max_page (int): The maximum page number to scrape.
-        start_page (int): The page number to start scraping from. Defaults to 0.
+    Records the status of every (state, page) in a SQLite file so that a rerun resumes
+    exactly where the previous run stopped. Safe to share between worker threads.
     """
-    print(f"\n{'='*20} Starting scrape for State: {state_code} from Page: {start_page} {'='*20}")
 
-    # Create a unique output directory for this state, located next to the script.
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    output_dir = os.path.join(script_dir, f"auction_results_state_{state_code}")
-    
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        print(f"Directory '{output_dir}' created.")
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                   state INTEGER NOT NULL,
+                   page INTEGER NOT NULL,
+                   status TEXT NOT NULL,
+                   rows INTEGER,
+                   attempts INTEGER NOT NULL DEFAULT 0,
+                   error TEXT,
+                   updated_at REAL NOT NULL,
+                   PRIMARY KEY (state, page)
+               )"""
+        )
+        self._conn.commit()
 
-    base_url = f"https://madangs.com/search?addr=11+41+27+29+28+26+30+31&court=&asset_classification=&build_area_max=0&build_area_min=0&disposal_method=undefined&eval_p_max=0&eval_p_min=0&g_use_type=2000,2001,2007&land_area_max=0&land_area_min=0&list_type=1&low_p_max=0&low_p_min=0&state={state_code}&g_state=undefined&share=2&g_share=2&special=&contain_special=0&uchal=&use_type=2000&sort=bd_asc&start_date=2020-01-01&end_date=2025-09-01&page={{page}}"
-    
-    driver = None
-    try:
-        # --- Driver and Initial Setup ---
-        options = webdriver.ChromeOptions()
-        service = Service(ChromeDriverManager().install())
-        driver = webdriver.Chrome(service=service, options=options)
+    def pages_with_status(self, state_code, statuses):
+        with self._lock:
+            placeholders = ",".join("?" * len(statuses))
+            rows = self._conn.execute(
+                f"SELECT page FROM pages WHERE state = ? AND status IN ({placeholders})",
+                (state_code, *statuses),
+            ).fetchall()
+        return {r[0] for r in rows}
+
+    def mark(self, state_code, page_num, status, rows=None, attempts=0, error=None):
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO pages (state, page, status, rows, attempts, error, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(state, page) DO UPDATE SET
+                       status = excluded.status, rows = excluded.rows,
+                       attempts = excluded.attempts, error = excluded.error,
+                       updated_at = excluded.updated_at""",
+                (state_code, page_num, status, rows, attempts, error, time.time()),
+            )
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
 
-        # Go to the start page to set the display mode
-        print(f"--- Initial Setup: Setting display mode on page {start_page} ---")
-        driver.get(base_url.format(page=start_page))
 
-        print("Waiting for initial loading overlay...")
+# --- Browser Workers ---
+def build_base_url(state_code):
+    return f"https://madangs.com/search?addr=11+41+27+29+28+26+30+31&court=&asset_classification=&build_area_max=0&build_area_min=0&disposal_method=undefined&eval_p_max=0&eval_p_min=0&g_use_type=2000,2001,2007&land_area_max=0&land_area_min=0&list_type=1&low_p_max=0&low_p_min=0&state={state_code}&g_state=undefined&share=2&g_share=2&special=&contain_special=0&uchal=&use_type=2000&sort=bd_asc&start_date=2020-01-01&end_date=2025-09-01&page={{page}}"
+
+def create_driver(setup_url):
+    """Starts a Chrome instance and switches the search results to list display mode."""
+    options = webdriver.ChromeOptions()
+    service = Service(ChromeDriverManager().install())
+    driver = webdriver.Chrome(service=service, options=options)
+
+    try:
+        driver.get(setup_url)
         WebDriverWait(driver, 10).until(EC.invisibility_of_element_located((By.ID, "loading")))
-        print("✅ Loading overlay gone.")
 
-        print("Waiting for the display mode button...")
         display_mode_button_selector = ".swiper-slide.filter_swiper_slide.js_display_mode"
         WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.CSS_SELECTOR, display_mode_button_selector)))
-        display_mode_button = driver.find_element(By.CSS_SELECTOR, display_mode_button_selector)
-        display_mode_button.click()
-        print("✅ Display mode button clicked.")
-
-        print("Waiting for list view to load after click...")
-        WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, "a.search_list")))
-        print("✅ Initial setup complete. Starting pagination.")
-        
-        # --- Pagination and Scraping Loop ---
-        for page_num in range(start_page, max_page + 1, 60):
-            if page_num != start_page:
-                auction_site = base_url.format(page=page_num)
-                print(f"--- Navigating to Page: {page_num} ---")
-                driver.get(auction_site)
-                
-                print("Waiting for page content to load...")
-                WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.CSS_SELECTOR, "a.search_list")))
-                print("✅ Page content loaded.")
-            else:
-                 print(f"--- Processing Page: {page_num} (already loaded) ---")
+        driver.find_element(By.CSS_SELECTOR, display_mode_button_selector).click()
+
+        WebDriverWait(driver, PAGE_LOAD_TIMEOUT).until(_page_loaded(NO_RESULTS_CLASS))
+    except Exception:
+        driver.quit()
+        raise
+    return driver
+
+def _page_loaded(no_results_class):
+    """Wait condition: the result list, or the no-results marker when one is configured."""
+    conditions = [EC.presence_of_element_located((By.CSS_SELECTOR, RESULT_LIST_SELECTOR))]
+    if no_results_class:
+        conditions.append(EC.presence_of_element_located((By.CLASS_NAME, no_results_class)))
+    return EC.any_of(*conditions)
 
+def fetch_page(driver, url, no_results_class=NO_RESULTS_CLASS):
+    """
+    Loads a results page and returns its rendered HTML once the result list (or the
+    no-results marker) is present. Raises TimeoutException otherwise; the caller retries.
+    """
+    driver.get(url)
+    WebDriverWait(driver, PAGE_LOAD_TIMEOUT).until(_page_loaded(no_results_class))
+    return driver.page_source
+
+
+# --- Main Execution ---
+def _output_dir(script_dir, state_code):
+    output_dir = os.path.join(script_dir, f"auction_results_state_{state_code}")
+    os.makedirs(output_dir, exist_ok=True)
+    return output_dir
+
+def save_page_results(output_dir, page_num, parsed_results):
+    """Writes the parsed rows of one page to madangs_results_page_{n}.csv."""
+    df = pd.DataFrame(parsed_results)
+    file_path = os.path.join(output_dir, f"madangs_results_page_{page_num}.csv")
+    df.to_csv(file_path, index=False, encoding="utf-8-sig")
+    return len(df)
+
+def seed_manifest_from_files(manifest, state_code, output_dir):
+    """Marks pages whose CSV already exists (e.g. from runs before the manifest existed) as done."""
+    known = manifest.pages_with_status(state_code, ("done",))
+    for name in os.listdir(output_dir):
+        match = re.fullmatch(r"madangs_results_page_(\d+)\.csv", name)
+        if match and int(match.group(1)) not in known:
+            manifest.mark(state_code, int(match.group(1)), "done")
+
+def crawl(tasks, num_workers=NUM_WORKERS, max_retries=MAX_RETRIES, retry_backoff=RETRY_BACKOFF,
+          page_delay=PAGE_DELAY, base_url_for_state=build_base_url, driver_factory=create_driver,
+          no_results_class=NO_RESULTS_CLASS, output_root=None):
+    """
+    Crawls every (state, page) of the given tasks with a pool of browser workers.
+
+    Args:
+        tasks (list): (state_code, max_page) or (state_code, max_page, start_page) tuples.
+        num_workers (int): Number of concurrent browser workers.
+        max_retries (int): Attempts per page before it is marked as failed.
+        retry_backoff (float): Base delay in seconds; the n-th retry waits retry_backoff * 2**(n-1).
+        page_delay (float): Politeness delay after each page, per worker.
+        base_url_for_state (callable): state_code -> URL template with a {page} placeholder
+            (point it at a local server to crawl saved HTML fixtures).
+        driver_factory (callable): setup URL -> WebDriver.
+        no_results_class (str): Class of the site's no-results marker. Only a page carrying it ends
+            the state; timeouts, parse errors and pages without listings are retried.
+        output_root (str): Directory for the manifest, archive and results. Defaults to this script's directory.
+    """
+    script_dir = output_root or os.path.dirname(os.path.abspath(__file__))
+    manifest = CrawlManifest(os.path.join(script_dir, MANIFEST_FILE))
+    archive = HtmlArchive(os.path.join(script_dir, ARCHIVE_DIR))
+
+    # Pages already crawled (or known to be past the end) are skipped on a rerun
+    jobs = queue.Queue()
+    end_page = {}
+    for task in tasks:
+        state_code, max_page = task[0], task[1]
+        start_page = task[2] if len(task) > 2 else 0
+        seed_manifest_from_files(manifest, state_code, _output_dir(script_dir, state_code))
+        skipped = manifest.pages_with_status(state_code, ("done",))
+        # Trust an "empty" page only if its archived HTML still shows the no-results marker
+        empty_pages = {p for p in manifest.pages_with_status(state_code, ("empty",))
+                       if has_no_results_marker(archive.get(state_code, p) or "", no_results_class)}
+        end_page[state_code] = min(empty_pages) if empty_pages else None
+        pending = [p for p in range(start_page, max_page + 1, PAGE_STEP) if p not in skipped]
+        print(f"State {state_code}: {len(pending)} pages pending ({len(skipped)} already done).")
+        for page_num in pending:
+            jobs.put((state_code, page_num))
+
+    end_lock = threading.Lock()
+
+    def past_end(state_code, page_num):
+        with end_lock:
+            return end_page[state_code] is not None and page_num > end_page[state_code]
+
+    def close_driver(session):
+        if session["driver"] is not None:
             try:
-                dynamic_html = driver.page_source
-                parsed_results = parse_page(dynamic_html)
-            
-                if parsed_results:
-                    df = pd.DataFrame(parsed_results)
-                    file_path = os.path.join(output_dir, f"madangs_results_page_{page_num}.csv")
-                    df.to_csv(file_path, index=False, encoding="utf-8-sig")
-                    print(f"✅ Saved {len(df)} rows to {file_path}")
-                else:
-                    print("No results found on this page. This might be the end for this state.")
-                    break
+                session["driver"].quit()
+            except WebDriverException:
+                pass
+            session["driver"] = None
+            print(f" Worker {session['worker_id']}: browser closed.")
 
+    def process(session, state_code, page_num):
+        url = base_url_for_state(state_code).format(page=page_num)
+        for attempt in range(1, max_retries + 1):
+            try:
+                if session["driver"] is None:
+                    session["driver"] = driver_factory(url)
+                    print(f" Worker {session['worker_id']}: browser ready.")
+                html = fetch_page(session["driver"], url, no_results_class)
+                archive.put(state_code, page_num, html)
+                parsed_results = parse_page(html, strict=True)
+                if not parsed_results:
+                    if not has_no_results_marker(html, no_results_class):
+                        raise ValueError("no listings and no no-results marker on the page")
+                    # The site's no-results marker: this is the end for this state, skip every later page
+                    with end_lock:
+                        if end_page[state_code] is None or page_num < end_page[state_code]:
+                            end_page[state_code] = page_num
+                    manifest.mark(state_code, page_num, "empty", rows=0, attempts=attempt)
+                    return
+                rows = save_page_results(_output_dir(script_dir, state_code), page_num, parsed_results)
+                manifest.mark(state_code, page_num, "done", rows=rows, attempts=attempt)
+                return
             except Exception as e:
-                print(f" An error occurred while processing page {page_num}: {e}")
-                error_log_path = os.path.join(output_dir, "error_log.txt")
+                if isinstance(e, WebDriverException) and not isinstance(e, TimeoutException):
+                    # The browser session may be dead: start a fresh one for the next attempt/page
+                    close_driver(session)
+                if attempt < max_retries:
+                    wait = retry_backoff * 2 ** (attempt - 1)
+                    print(f" Page {page_num} (state {state_code}) failed on attempt {attempt}: {e}. Retrying in {wait:.0f}s.")
+                    time.sleep(wait)
+                    continue
+                print(f" Page {page_num} (state {state_code}) failed after {attempt} attempts: {e}")
+                manifest.mark(state_code, page_num, "failed", attempts=attempt, error=str(e))
+                error_log_path = os.path.join(_output_dir(script_dir, state_code), "error_log.txt")
                 with open(error_log_path, "a", encoding="utf-8") as f:
-                    f.write(f"Error on page {page_num} for state {state_code}: {e}\nURL: {base_url.format(page=page_num)}\n\n")
-                continue
-            
-            time.sleep(1)
+                    f.write(f"Error on page {page_num} for state {state_code}: {e}\nURL: {url}\n\n")
 
-    except Exception as e:
-        print(f" A critical error occurred during the Selenium process for state {state_code}: {e}")
+    def worker(worker_id):
+        session = {"worker_id": worker_id, "driver": None}
+        try:
+            while True:
+                try:
+                    state_code, page_num = jobs.get_nowait()
+                except queue.Empty:
+                    return
+                if past_end(state_code, page_num):
+                    continue
+                process(session, state_code, page_num)
+                time.sleep(page_delay)
+        finally:
+            close_driver(session)
+
+    try:
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            futures = [executor.submit(worker, i) for i in range(num_workers)]
+            for future in futures:
+                future.result()
     finally:
-        if driver:
-            driver.quit()
-            print(f" Browser closed for state {state_code}.")
+        manifest.close()
+        archive.close()
+    print("--- Crawl finished ---")
+
+def scrape_by_state(state_code, max_page, start_page=0, num_workers=NUM_WORKERS):
+    """
+    Crawls auction data for a specific state code, from a start page up to a maximum page number.
+    Pages already recorded in the manifest are skipped.
     
-    print(f"--- Scraping process finished for State: {state_code} ---")
+    Args:
+        state_code (int): The state code to filter by (e.g., 40, 50).
+        max_page (int): The maximum page number to scrape.
+        start_page (int): The page number to start scraping from. Defaults to 0.
+        num_workers (int): Number of concurrent browser workers.
+    """
+    crawl([(state_code, max_page, start_page)], num_workers=num_workers)
+
+
+# --- Offline Re-parse ---
+def _reparse_chunk(entries, output_root, write_csv, collect_rows):
+    """Parses a chunk of archived pages (runs in a worker process)."""
+    frames = []
+    for state_code, page_num, shard_path, offset, length, codec in entries:
+        parsed_results = parse_page(read_record(shard_path, offset, length, codec))
+        if not parsed_results:
+            continue
+        if write_csv:
+            save_page_results(_output_dir(output_root, state_code), page_num, parsed_results)
+        if collect_rows:
+            df = pd.DataFrame(parsed_results)
+            df.insert(0, "page", page_num)
+            df.insert(0, "state", state_code)
+            frames.append(df)
+    return frames, len(entries)
+
+def _write_combined(frames, output_root):
+    df = pd.concat(frames, ignore_index=True)
+    # Same representation as after a round trip through the per-page CSVs
+    df["기타정보"] = df["기타정보"].astype(str)
+    df["유찰횟수"] = pd.to_numeric(df["유찰횟수"], errors="coerce").astype("Int64")
+    df = df.sort_values(["state", "page"], kind="stable", ignore_index=True)
+    if pyarrow is not None:
+        path = os.path.join(output_root, f"{COMBINED_OUTPUT}.parquet")
+        df.to_parquet(path, index=False)
+    else:
+        path = os.path.join(output_root, f"{COMBINED_OUTPUT}.csv")
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+    return path, len(df)
+
+def reparse(states=None, output="csv", num_workers=None, output_root=None):
+    """
+    Regenerates parsed results from the raw HTML archive instead of re-crawling.
+
+    Args:
+        states (list): State codes to re-parse. Defaults to every archived state.
+        output (str): 'csv' rewrites madangs_results_page_{n}.csv per page,
+            'combined' writes a single Parquet file (CSV when pyarrow is not installed),
+            'both' does both.
+        num_workers (int): Worker processes. Defaults to the number of CPU cores.
+        output_root (str): Directory for the outputs. Defaults to this script's directory.
+    """
+    if output not in ("csv", "combined", "both"):
+        raise ValueError(f"Unknown output: {output}")
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    output_root = output_root or script_dir
+
+    archive = HtmlArchive(os.path.join(script_dir, ARCHIVE_DIR))
+    try:
+        entries = archive.entries(states)
+    finally:
+        archive.close()
+    if not entries:
+        print("No archived pages to re-parse.")
+        return None
+
+    write_csv = output in ("csv", "both")
+    collect_rows = output in ("combined", "both")
+    chunks = [entries[i:i + REPARSE_CHUNK] for i in range(0, len(entries), REPARSE_CHUNK)]
+    print(f"Re-parsing {len(entries)} archived pages in {len(chunks)} chunks...")
+
+    frames, done = [], 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=num_workers or os.cpu_count()) as executor:
+        futures = [executor.submit(_reparse_chunk, chunk, output_root, write_csv, collect_rows) for chunk in chunks]
+        for future in futures:
+            chunk_frames, n_pages = future.result()
+            frames.extend(chunk_frames)
+            done += n_pages
+    print(f"Re-parsed {done} pages in {time.perf_counter() - start:.1f}s.")
+
+    if collect_rows and frames:
+        path, n_rows = _write_combined(frames, output_root)
+        print(f"Saved {n_rows} rows to '{path}'.")
+        return path
+    return output_root
 
 
 if __name__ == "__main__":
-    # Define the scraping tasks: (state_code, max_page, start_page)
-    tasks = [
-        (40, 33300, 7920),
-        (50, 10440, 0)
-    ]
+    parser = argparse.ArgumentParser(description="Madang auction crawler")
+    parser.add_argument("--no-results-class", default=NO_RESULTS_CLASS,
+                        help="class of the site's no-results marker (confirm it on a saved page first); "
+                             "only pages carrying it end a state's crawl")
+    subparsers = parser.add_subparsers(dest="command")
+    reparse_parser = subparsers.add_parser("reparse", help="re-parse the raw HTML archive instead of crawling")
+    reparse_parser.add_argument("--states", type=int, nargs="*", help="state codes (default: all archived)")
+    reparse_parser.add_argument("--output", choices=["csv", "combined", "both"], default="csv")
+    reparse_parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
 
-    for i, (state, max_p, start_p) in enumerate(tasks):
-        try:
-            scrape_by_state(state_code=state, max_page=max_p, start_page=start_p)
-        except Exception as e:
-            print(f" A fatal, unrecoverable error occurred during the task for state {state}. ")
-            print(f"Error: {e}")
-            # Log this major failure
-            with open("fatal_error_log.txt", "a", encoding="utf-8") as f:
-                f.write(f"Fatal error on state {state} task: {e}\n\n")
+    if args.command == "reparse":
+        reparse(states=args.states, output=args.output, num_workers=args.workers)
+        sys.exit(0)
 
-        # If it's not the last task, wait before starting the next one
-        if i < len(tasks) - 1:
-            print(f"\n{'='*20} Task for state {state} finished. Waiting for 5 seconds before next task... {'='*20}\n")
-            time.sleep(5)
+    # Define the scraping tasks: (state_code, max_page)
+    # Completed pages are tracked in the manifest, so a rerun resumes automatically.
+    tasks = [
+        (40, 33300),
+        (50, 10440)
+    ]
 
+    try:
+        crawl(tasks, no_results_class=args.no_results_class)
+    except Exception as e:
+        print(" A fatal, unrecoverable error occurred during the crawl. ")
+        print(f"Error: {e}")
+        # Log this major failure
+        with open("fatal_error_log.txt", "a", encoding="utf-8") as f:
+            f.write(f"Fatal error during crawl {tasks}: {e}\n\n")
@@ -0,0 +1,166 @@
+"""
+parse_page benchmark over stored search result pages.
+- Compares the lxml parser (parse_page) with the BeautifulSoup reference (parse_page_bs4,
+  the crawler's original parser, kept here) for output parity and throughput.
+- The corpus is the crawler's raw HTML archive, or a directory of saved page HTML
+  files (*.html or *.html.gz).
+
+Usage: python benchmark_parse_page.py [corpus_dir]
+"""
+import os
+import sys
+import gzip
+import glob
+import re
+import time
+from bs4 import BeautifulSoup
+
+from Crawling_Auction_Madang import parse_page
+from html_archive import ARCHIVE_DIR, INDEX_FILE, HtmlArchive, read_record
+
+DEFAULT_CORPUS_DIR = ARCHIVE_DIR
+N_REPEAT = 3
+
+def parse_page_bs4(html):
+    """Reference BeautifulSoup implementation of parse_page (the crawler's original parser)."""
+    soup = BeautifulSoup(html, "html.parser")
+    data_list = []
+
+    items = soup.select("a.search_list")
+
+    for item in items:
+        try:
+            # 소재지
+            address_element = item.select_one(".list_text_addr")
+            address = address_element.get_text(strip=True) if address_element else "N/A"
+            
+            # 면적
+            area_element = item.select_one(".list_area_wrapper")
+            area = ' '.join(area_element.get_text().split()) if area_element else ""
+            
+            building_area_match = re.search(r"건물\s*([\d,.]+)", area)
+            if building_area_match:
+                building_area = building_area_match.group(1).replace(',', '')
+            else:
+                building_area = "N/A"
+
+            land_area_match = re.search(r"토지\s*([\d,.]+)", area)
+            if land_area_match:
+                land_area = land_area_match.group(1).replace(',', '')
+            else:
+                land_area = "N/A"
+            
+            # 기타 정보
+            special_element = item.select_one(".mul_special_right_wrapper")
+            special = special_element.get_text().split() if special_element else "N/A"
+
+            #감정가
+            price_element = item.select_one(".price")
+            price = price_element.get_text(strip=True) if price_element else "N/A"
+
+            # 최저가
+            min_price_element = item.select_one(".price.low")
+            min_price_text = min_price_element.get_text(strip=True) if min_price_element else "N/A"
+            if min_price_text != "N/A":
+                min_price = min_price_text.replace('최', '').replace('원', '').replace(',', '')
+            else:
+                min_price = None
+
+            # 낙찰가
+            win_price_element = item.select_one(".price.sold")
+            win_price_text = win_price_element.get_text(strip=True) if win_price_element else "N/A"
+            if win_price_text != "N/A":
+                win_price = win_price_text.replace('낙', '').replace('원', '').replace(',', '')
+            else:
+                win_price = None
+
+            # 진행상태
+            status_element = item.select_one(".state")
+            status = status_element.get_text(strip=True) if status_element else "N/A"
+
+            # 매각기일
+            sale_date_element = item.select_one(".date")
+            sale_date = sale_date_element.get_text(strip=True) if sale_date_element else "N/A"
+            
+            # 유찰횟수
+            uchal_element = item.select_one(".uchal")
+            uchal_text = uchal_element.get_text(strip=True) if uchal_element else "N/A"
+            uchal_match = re.search(r'\d+', uchal_text)
+            if uchal_match:
+                ucal = int(uchal_match.group(0))
+            else:
+                ucal = "N/A"
+            
+            
+            data_list.append({
+                "소재지": address,
+                "건물면적": building_area,
+                "토지면적": land_area,
+                "감정가": price,
+                "최저가": min_price,
+                "낙찰가": win_price,
+                "매각기일": sale_date,
+                "유찰횟수": ucal,
+                "기타정보": special,
+                "진행상태": status
+            })
+            
+        except Exception as e:
+            print(f"⚠️ Error parsing an item: {e}")
+            continue
+    
+    return data_list
+
+def load_corpus(corpus_dir):
+    """Reads every stored page in the corpus directory (archive order, or file name order)."""
+    if os.path.exists(os.path.join(corpus_dir, INDEX_FILE)):
+        archive = HtmlArchive(corpus_dir)
+        try:
+            entries = archive.entries()
+        finally:
+            archive.close()
+        return [(f"state_{state}_page_{page}", read_record(path, offset, length, codec))
+                for state, page, path, offset, length, codec in entries]
+
+    paths = sorted(glob.glob(os.path.join(corpus_dir, "*.html")) + glob.glob(os.path.join(corpus_dir, "*.html.gz")))
+    pages = []
+    for path in paths:
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+def best_time(func, pages):
+    """Returns the fastest of N_REPEAT runs over the whole corpus, with the parsed results."""
+    best, results = float("inf"), None
+    for _ in range(N_REPEAT):
+        start = time.perf_counter()
+        results = [func(html) for _, html in pages]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+def main():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    corpus_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(script_dir, DEFAULT_CORPUS_DIR)
+    pages = load_corpus(corpus_dir)
+    if not pages:
+        print(f"No stored pages (*.html, *.html.gz) found in {corpus_dir}.")
+        sys.exit(1)
+
+    t_bs4, expected = best_time(parse_page_bs4, pages)
+    t_lxml, actual = best_time(parse_page, pages)
+    n_items = sum(len(rows) for rows in expected)
+    mismatched = [name for (name, _), a, b in zip(pages, expected, actual) if a != b]
+
+    print("\n--- parse_page benchmark ---")
+    print(f"Pages: {len(pages)}, items: {n_items}")
+    print(f"BeautifulSoup (html.parser): {t_bs4 * 1000:,.1f} ms ({n_items / t_bs4:,.0f} items/s)")
+    print(f"lxml (compiled XPath):       {t_lxml * 1000:,.1f} ms ({n_items / t_lxml:,.0f} items/s)")
+    print(f"Speed-up: {t_bs4 / t_lxml:.1f}x")
+    if mismatched:
+        print(f"[ERROR] Output differs on {len(mismatched)} pages: {mismatched[:10]}")
+        sys.exit(1)
+    print("Outputs are identical on every page.")
+
+if __name__ == "__main__":
+    main()
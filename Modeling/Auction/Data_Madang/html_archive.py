@@ -0,0 +1,139 @@
+"""
+Append-only archive of raw result pages fetched by the Madang crawler.
+- Every page_source is compressed and appended to a shard file (shard_00000.bin, ...).
+- A SQLite index maps (state, page) to (shard, offset, length, codec) of the latest copy.
+- Records are written before they are indexed, so an interrupted write is never visible.
+"""
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+# zstandard is optional; pages are stored with zlib when it is not installed
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_DIR = "html_archive"
+INDEX_FILE = "index.sqlite"
+SHARD_MAX_BYTES = 256 * 1024 * 1024   # a new shard is started once the current one exceeds this
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+
+def default_codec():
+    return "zstd" if zstandard is not None else "zlib"
+
+def compress(data, codec):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if codec == "zlib":
+        return zlib.compress(data, ZLIB_LEVEL)
+    raise ValueError(f"Unknown codec: {codec}")
+
+def decompress(data, codec):
+    if codec == "zstd":
+        if zstandard is None:
+            raise ImportError("This archive contains zstd records; install the 'zstandard' package to read it.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "zlib":
+        return zlib.decompress(data)
+    raise ValueError(f"Unknown codec: {codec}")
+
+def read_record(shard_path, offset, length, codec):
+    """Reads and decodes one archived page (usable from worker processes without the index)."""
+    with open(shard_path, "rb") as f:
+        f.seek(offset)
+        return decompress(f.read(length), codec).decode("utf-8")
+
+
+class HtmlArchive:
+    """
+    Compressed, append-only store of raw page HTML keyed by (state, page).
+    Safe to share between worker threads; a re-fetched page is appended again and the
+    index points to the newest copy.
+    """
+
+    def __init__(self, archive_dir, codec=None):
+        self.archive_dir = archive_dir
+        self.codec = codec or default_codec()
+        os.makedirs(archive_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(archive_dir, INDEX_FILE), check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                   state INTEGER NOT NULL,
+                   page INTEGER NOT NULL,
+                   shard TEXT NOT NULL,
+                   offset INTEGER NOT NULL,
+                   length INTEGER NOT NULL,
+                   codec TEXT NOT NULL,
+                   fetched_at REAL NOT NULL,
+                   PRIMARY KEY (state, page)
+               )"""
+        )
+        self._conn.commit()
+        self._shard = self._current_shard()
+
+    def _current_shard(self):
+        shards = sorted(n for n in os.listdir(self.archive_dir) if n.startswith("shard_") and n.endswith(".bin"))
+        if shards and os.path.getsize(os.path.join(self.archive_dir, shards[-1])) < SHARD_MAX_BYTES:
+            return shards[-1]
+        return f"shard_{len(shards):05d}.bin"
+
+    def shard_path(self, shard):
+        return os.path.join(self.archive_dir, shard)
+
+    def put(self, state_code, page_num, html):
+        """Compresses and appends one page, then records its location in the index."""
+        record = compress(html.encode("utf-8"), self.codec)
+        with self._lock:
+            path = self.shard_path(self._shard)
+            with open(path, "ab") as f:
+                offset = f.tell()
+                f.write(record)
+                f.flush()
+                os.fsync(f.fileno())
+            self._conn.execute(
+                """INSERT INTO pages (state, page, shard, offset, length, codec, fetched_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(state, page) DO UPDATE SET
+                       shard = excluded.shard, offset = excluded.offset, length = excluded.length,
+                       codec = excluded.codec, fetched_at = excluded.fetched_at""",
+                (state_code, page_num, self._shard, offset, len(record), self.codec, time.time()),
+            )
+            self._conn.commit()
+            if offset + len(record) >= SHARD_MAX_BYTES:
+                self._shard = self._current_shard()
+
+    def entries(self, states=None):
+        """
+        Returns the index entries as (state, page, shard_path, offset, length, codec) tuples,
+        sorted by shard and offset so that readers scan each shard sequentially.
+        """
+        query = "SELECT state, page, shard, offset, length, codec FROM pages"
+        params = ()
+        if states:
+            query += f" WHERE state IN ({','.join('?' * len(states))})"
+            params = tuple(states)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY shard, offset", params).fetchall()
+        return [(state, page, self.shard_path(shard), offset, length, codec)
+                for state, page, shard, offset, length, codec in rows]
+
+    def get(self, state_code, page_num):
+        """Returns the archived HTML of a page, or None when it was never archived."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT shard, offset, length, codec FROM pages WHERE state = ? AND page = ?",
+                (state_code, page_num),
+            ).fetchone()
+        if row is None:
+            return None
+        shard, offset, length, codec = row
+        return read_record(self.shard_path(shard), offset, length, codec)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
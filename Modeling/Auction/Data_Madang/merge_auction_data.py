@@ -1,61 +1,248 @@
 import pandas as pd
+import numpy as np
 import glob
+import json
 import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
 
-def merge_auction_data():
+# pyarrow is optional; without it the dataset parts are stored as pickle files
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+# State-specific result directories written by the crawler
+STATE_DIRS = {
+    40: "auction_results_state_40",
+    50: "auction_results_state_50",
+}
+DATASET_DIR = "auction_dataset"          # partitioned dataset: state=<code>/part-<n>.<ext>
+MANIFEST_FILE = "_ingested.json"         # path -> (mtime, size, part) of every ingested page CSV
+COMBINED_CSV = "auction_data_combined.csv"   # read by preprocess.py; rewritten whenever the dataset changes
+MAX_PARTS_PER_STATE = 16                 # a state with more parts is compacted into a single part
+READ_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+PAGE_FILE_PATTERN = re.compile(r"madangs_results_page_(\d+)\.csv")
+
+# Fixed schema of the dataset (same columns as the crawler's page CSVs)
+TEXT_COLUMNS = ["소재지", "감정가", "최저가", "낙찰가", "매각기일", "기타정보", "진행상태"]
+NUMERIC_COLUMNS = ["건물면적", "토지면적", "유찰횟수"]
+AUCTION_COLUMNS = ["소재지", "건물면적", "토지면적", "감정가", "최저가", "낙찰가", "매각기일", "유찰횟수", "기타정보", "진행상태"]
+SOURCE_COLUMNS = ["state", "page", "source_file"]
+
+def _part_ext():
+    return "parquet" if pyarrow is not None else "pkl"
+
+def _write_part(df, path):
+    tmp_path = path + ".tmp"
+    if path.endswith(".parquet"):
+        df.to_parquet(tmp_path, index=False)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+def _read_part(path):
+    if not os.path.exists(path):
+        return None
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_pickle(path)
+
+def _file_signature(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+def _load_manifest(dataset_dir):
+    path = os.path.join(dataset_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)["files"]
+
+def _save_manifest(dataset_dir, files):
+    path = os.path.join(dataset_dir, MANIFEST_FILE)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump({"version": 1, "files": files}, f, ensure_ascii=False)
+    os.replace(path + ".tmp", path)
+
+def normalize_schema(df):
+    """Casts a frame of crawled rows to the fixed dataset dtypes."""
+    df = df.reindex(columns=AUCTION_COLUMNS + [c for c in SOURCE_COLUMNS if c in df.columns])
+    for c in TEXT_COLUMNS:
+        df[c] = df[c].astype(object).where(df[c].notna(), np.nan)
+    for c in NUMERIC_COLUMNS:
+        df[c] = pd.to_numeric(df[c], errors="coerce").astype("float64")
+    return df
+
+def read_page_csv(path, state_code, script_dir):
+    """Reads one crawled page CSV, tagging each row with its source file and page number."""
+    df = pd.read_csv(path, dtype=str)
+    page = PAGE_FILE_PATTERN.fullmatch(os.path.basename(path))
+    df["state"] = state_code
+    df["page"] = int(page.group(1)) if page else -1
+    df["source_file"] = os.path.relpath(path, script_dir)
+    return df
+
+def _remove_stale_rows(dataset_dir, manifest, stale_files):
+    """Drops the rows of changed or deleted page files from the parts that hold them."""
+    parts = {}
+    for rel_path in stale_files:
+        parts.setdefault(manifest[rel_path][2], set()).add(rel_path)
+    for part, rel_paths in parts.items():
+        part_path = os.path.join(dataset_dir, part)
+        df = _read_part(part_path)
+        if df is None:
+            continue
+        df = df[~df["source_file"].isin(rel_paths)]
+        if df.empty:
+            os.remove(part_path)
+        else:
+            _write_part(df.reset_index(drop=True), part_path)
+
+def _remove_orphan_parts(dataset_dir, manifest):
+    """Deletes parts that no manifest entry refers to (left behind by an interrupted run)."""
+    referenced = {entry[2] for entry in manifest.values()}
+    for path in glob.glob(os.path.join(dataset_dir, "state=*", "part-*")):
+        if os.path.relpath(path, dataset_dir) not in referenced:
+            os.remove(path)
+
+def _next_part_path(dataset_dir, state_code):
+    part_dir = os.path.join(dataset_dir, f"state={state_code}")
+    os.makedirs(part_dir, exist_ok=True)
+    numbers = [int(re.search(r"part-(\d+)", name).group(1)) for name in os.listdir(part_dir)
+               if re.match(r"part-\d+\.", name)]
+    return os.path.join(part_dir, f"part-{max(numbers, default=-1) + 1:05d}.{_part_ext()}")
+
+def _part_number(path):
+    return int(re.search(r"part-(\d+)", os.path.basename(path)).group(1))
+
+def _compact_state(dataset_dir, manifest, state_code):
+    """
+    Rewrites the parts of a state into a single part once it has more than MAX_PARTS_PER_STATE.
+    The new part is written and the manifest saved before the old parts are deleted, so an
+    interrupted compaction leaves either the old parts or an orphan that the next run removes.
+    """
+    prefix = f"state={state_code}" + os.sep
+    parts = sorted({entry[2] for entry in manifest.values() if entry[2].startswith(prefix)},
+                   key=_part_number)
+    if len(parts) <= MAX_PARTS_PER_STATE:
+        return
+    frames = [df for df in (_read_part(os.path.join(dataset_dir, p)) for p in parts) if df is not None]
+    part_path = _next_part_path(dataset_dir, state_code)
+    _write_part(pd.concat(frames, ignore_index=True), part_path)
+    part = os.path.relpath(part_path, dataset_dir)
+    for entry in manifest.values():
+        if entry[2] in parts:
+            entry[2] = part
+    _save_manifest(dataset_dir, manifest)
+    for old_part in parts:
+        os.remove(os.path.join(dataset_dir, old_part))
+    print(f"State {state_code}: compacted {len(parts)} parts into '{part}'.")
+
+def merge_auction_data(rebuild=False):
     """
-    Merges all CSV files from state-specific auction result directories
-    into a single CSV file.
+    Incrementally merges the crawled page CSVs of every state directory into a partitioned
+    dataset (auction_dataset/state=<code>/part-<n>). Only page files that are new or whose
+    mtime/size changed since the last run are read; rows of changed or deleted files are
+    replaced. A state's parts are compacted into one once there are more than MAX_PARTS_PER_STATE.
+
+    Args:
+        rebuild (bool): Discard the dataset and ingest every page file again.
+
+    Returns:
+        bool: True when the dataset changed.
     """
     # The script is located in the same directory as the result folders.
     script_dir = os.path.dirname(os.path.abspath(__file__))
-    
-    # Define the directories to search for CSVs
-    dir_state_40 = os.path.join(script_dir, "auction_results_state_40")
-    dir_state_50 = os.path.join(script_dir, "auction_results_state_50")
-    
-    print(f"Searching for CSV files in:\n- {dir_state_40}\n- {dir_state_50}")
-    
-    # Find all CSV files in both directories
-    csv_files_40 = glob.glob(os.path.join(dir_state_40, "*.csv"))
-    csv_files_50 = glob.glob(os.path.join(dir_state_50, "*.csv"))
-    all_csv_files = csv_files_40 + csv_files_50
-    
-    if not all_csv_files:
-        print("No CSV files found to merge.")
-        return
+    dataset_dir = os.path.join(script_dir, DATASET_DIR)
+    os.makedirs(dataset_dir, exist_ok=True)
+
+    manifest = {} if rebuild else _load_manifest(dataset_dir)
+    _remove_orphan_parts(dataset_dir, manifest)
+
+    # Find all page CSV files in the state directories
+    current = {}
+    for state_code, dir_name in STATE_DIRS.items():
+        for path in glob.glob(os.path.join(script_dir, dir_name, "*.csv")):
+            current[os.path.relpath(path, script_dir)] = (state_code, path, _file_signature(path))
 
-    print(f"Found {len(all_csv_files)} CSV files to merge.")
-    
-    # Read and collect all DataFrames
+    stale = [p for p in manifest if p not in current or manifest[p][:2] != current[p][2]]
+    to_read = [p for p in current if p not in manifest or p in stale]
+    print(f"Found {len(current)} page files: {len(to_read)} new or changed, {len(stale)} stale entries.")
+
+    if stale:
+        _remove_stale_rows(dataset_dir, manifest, stale)
+        for rel_path in stale:
+            del manifest[rel_path]
+
+    # Read the new files in parallel
     df_list = []
-    for file in all_csv_files:
-        # Exclude error logs if any
-        if 'error_log.txt' in os.path.basename(file):
-            continue
-        try:
-            df = pd.read_csv(file)
-            df_list.append(df)
-        except Exception as e:
-            print(f"Could not read file {file}: {e}")
-
-    if not df_list:
-        print("No dataframes were created. Check the CSV files for issues.")
-        return
+    if to_read:
+        def read(rel_path):
+            state_code, path, _ = current[rel_path]
+            try:
+                return rel_path, read_page_csv(path, state_code, script_dir)
+            except Exception as e:
+                print(f"Could not read file {path}: {e}")
+                return rel_path, None
+
+        with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+            results = list(executor.map(read, to_read))
+        df_list = [(rel_path, df) for rel_path, df in results if df is not None]
 
-    # Concatenate all DataFrames
-    print("Concatenating all dataframes...")
-    combined_df = pd.concat(df_list, ignore_index=True)
-    
-    # Define the output file path
-    output_file = os.path.join(script_dir, "auction_data_combined.csv")
-    
-    # Save the combined DataFrame to a new CSV
+    # Append one new part per state
+    by_state = {}
+    for rel_path, df in df_list:
+        by_state.setdefault(current[rel_path][0], []).append((rel_path, df))
+    for state_code, items in by_state.items():
+        part_path = _next_part_path(dataset_dir, state_code)
+        part_df = normalize_schema(pd.concat([df for _, df in items], ignore_index=True))
+        _write_part(part_df, part_path)
+        part = os.path.relpath(part_path, dataset_dir)
+        for rel_path, _ in items:
+            manifest[rel_path] = current[rel_path][2] + [part]
+        print(f"State {state_code}: appended {len(part_df)} rows from {len(items)} files to '{part}'.")
+
+    _save_manifest(dataset_dir, manifest)
+    for state_code in by_state:
+        _compact_state(dataset_dir, manifest, state_code)
+    print(f"\n✅ Dataset '{DATASET_DIR}' is up to date ({len(manifest)} page files ingested).")
+    return bool(stale or by_state or rebuild)
+
+def load_auction_data(include_source=False):
+    """
+    Loads the merged auction dataset, reading the parts in parallel.
+    Rows are ordered by state, page and their position in the page.
+
+    Args:
+        include_source (bool): Keep the state / page / source_file columns.
+    """
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    dataset_dir = os.path.join(script_dir, DATASET_DIR)
+    parts = sorted({entry[2] for entry in _load_manifest(dataset_dir).values()})
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        frames = [df for df in executor.map(lambda p: _read_part(os.path.join(dataset_dir, p)), parts) if df is not None]
+    if not frames:
+        return pd.DataFrame(columns=AUCTION_COLUMNS + (SOURCE_COLUMNS if include_source else []))
+
+    df = pd.concat(frames, ignore_index=True)
+    df = df.sort_values(["state", "page"], kind="stable", ignore_index=True)
+    return df if include_source else df[AUCTION_COLUMNS]
+
+def export_combined_csv():
+    """Writes the dataset to auction_data_combined.csv (the previous output format, read by preprocess.py)."""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    output_file = os.path.join(script_dir, COMBINED_CSV)
+    combined_df = load_auction_data()
     print(f"Saving combined data to '{output_file}'...")
     combined_df.to_csv(output_file, index=False, encoding='utf-8-sig')
-    
-    print(f"\n✅ Successfully merged {len(all_csv_files)} files into '{os.path.basename(output_file)}'.")
     print(f"Total rows in combined file: {len(combined_df)}")
 
 if __name__ == "__main__":
-    merge_auction_data()
+    # auction_data_combined.csv is still written by default (rewritten when the dataset changed or
+    # the file is missing); --no-csv skips it for callers that only use load_auction_data().
+    changed = merge_auction_data(rebuild="--rebuild" in sys.argv)
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    if "--no-csv" not in sys.argv and (changed or not os.path.exists(os.path.join(script_dir, COMBINED_CSV))):
+        export_combined_csv()
@@ -1,31 +1,47 @@
-
 import pandas as pd
 import glob
 import os
+import sys
 
 # 데이터가 있는 폴더 경로
-data_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sales_data")
-
-# 해당 폴더의 모든 .xlsx 파일 경로를 가져옵니다.
-all_files = glob.glob(os.path.join(data_path, "*.xlsx"))
-
-# 각 파일을 읽어 데이터프레임 리스트를 만듭니다.
-li = []
-for filename in all_files:
-    df = pd.read_excel(filename, engine='openpyxl')
-    li.append(df)
-
-# 모든 데이터프레임을 하나로 합칩니다.
-if li:
+script_dir = os.path.dirname(os.path.abspath(__file__))
+data_path = os.path.join(script_dir, "sales_data")
+output_filename = os.path.join(script_dir, "sales_data_combined.csv")
+# 합본 생성에 사용된 입력 파일 키 목록 (입력이 바뀌지 않았으면 합본을 다시 쓰지 않음)
+output_key_file = os.path.join(data_path, "table_cache", "sales_data_combined.key")
+
+# csv/xlsx 캐시 로더 (Aptsales 전처리 스크립트와 공유)
+sys.path.append(os.path.join(script_dir, '..', '..', 'Aptsales', 'preprocessing'))
+from table_cache import file_key, read_tables
+
+def main():
+    # 해당 폴더의 모든 .xlsx 파일 경로를 가져옵니다.
+    all_files = sorted(glob.glob(os.path.join(data_path, "*.xlsx")))
+    if not all_files:
+        print("합칠 파일이 없습니다.")
+        return
+
+    input_key = "\n".join(f"{os.path.basename(f)}:{file_key(f)}" for f in all_files)
+    if os.path.exists(output_filename) and os.path.exists(output_key_file):
+        with open(output_key_file, encoding="utf-8") as f:
+            if f.read() == input_key:
+                print(f"입력 파일이 바뀌지 않아 기존 '{output_filename}' 파일을 그대로 사용합니다.")
+                return
+
+    # 각 파일을 동시에 읽습니다. (한 번 변환된 파일은 캐시에서 불러옴)
+    li = read_tables(all_files)
+
+    # 모든 데이터프레임을 하나로 합칩니다.
     combined_df = pd.concat(li, axis=0, ignore_index=True)
 
-    # 합쳐진 파일을 저장할 경로
-    output_filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sales_data_combined.csv")
-
     # CSV 파일로 저장합니다. (한글 깨짐 방지)
     combined_df.to_csv(output_filename, index=False, encoding='utf-8-sig')
+    os.makedirs(os.path.dirname(output_key_file), exist_ok=True)
+    with open(output_key_file, "w", encoding="utf-8") as f:
+        f.write(input_key)
 
     print(f"{len(all_files)}개의 파일을 합쳐 '{output_filename}' 파일로 저장했습니다.")
     print(f"총 {len(combined_df)}개의 행이 저장되었습니다.")
-else:
-    print("합칠 파일이 없습니다.")
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 import pandas as pd
+import numpy as np
 import re
 import os
-import math
+import sys
 import warnings
 
 warnings.filterwarnings('ignore', category=pd.errors.DtypeWarning)
@@ -12,68 +13,74 @@ sales_file = os.path.join(data_dir, 'sales_data_combined.csv')
 auction_file = os.path.join(data_dir, 'auction_data_combined.csv')
 si_code_file = os.path.join(data_dir, 'si_code.csv')
 output_file = os.path.join(data_dir, 'auction_preprocessed.csv')
+bjd_index_file = os.path.join(data_dir, 'bjd_code_index.joblib')
+auction_dataset_dir = os.path.join(data_dir, 'auction_dataset')
 
-# --- 1. 조회 딕셔너리 생성 함수들 ---
+# 법정동코드 해시 인덱스 (predict_apt와 공유)
+sys.path.append(os.path.join(data_dir, '..', '..', 'Aptsales', 'predict_model'))
+from bjd_index import load_bjd_index, map_bjd_codes
+from merge_auction_data import load_auction_data
+# csv/xlsx 캐시 로더 (Aptsales 전처리 스크립트와 공유)
+sys.path.append(os.path.join(data_dir, '..', '..', 'Aptsales', 'preprocessing'))
+from table_cache import read_table
 
-def create_road_address_lookup(sales_df):
-    print("도로명 주소용 조회 딕셔너리를 생성합니다...")
-    
-    lookup_df = sales_df.dropna(subset=['도로명', '건축년도', '시군구', '본번', '부번']).copy()
-    lookup_df['조회키'] = lookup_df['도로명'].apply(lambda x: x.replace(' ', '') if isinstance(x, str) else None)
-    lookup_df.dropna(subset=['조회키'], inplace=True)
+# --- 1. 조회 테이블 생성 함수들 ---
 
-    final_lookup = {}
-    
-    grouped = lookup_df.groupby('조회키').agg({
-        '건축년도': lambda x: list(x.unique()),
-        '시군구': lambda x: list(x.unique()),
-        '본번': lambda x: list(x.unique()),
-        '부번': lambda x: list(x.unique())
-    })
-
-    for key, row in grouped.iterrows():
-        years = row['건축년도']
-        
-        final_year = math.ceil(sum(years) / len(years)) if len(years) > 1 else years[0]
-        final_sigungu = row['시군구'][0] if len(row['시군구']) == 1 else pd.Series(row['시군구']).mode()[0]
-        final_bonbeon = row['본번'][0] if len(row['본번']) == 1 else pd.Series(row['본번']).mode()[0]
-        final_bubeon = row['부번'][0] if len(row['부번']) == 1 else pd.Series(row['부번']).mode()[0]
-
-        final_lookup[key] = {
-            '건축년도': final_year,
-            '시군구': final_sigungu,
-            '본번': final_bonbeon,
-            '부번': final_bubeon
-        }
-        
-    print(f"총 {len(final_lookup)}개의 도로명 키 생성 완료.")
-    return final_lookup
-
-def create_lot_address_lookup(sales_df):
-    print("지번 주소용 조회 딕셔너리를 생성합니다...")
-    
-    lookup_df = sales_df.dropna(subset=['시군구', '번지', '건축년도', '본번', '부번']).copy()
-    
-    grouped = lookup_df.groupby(['시군구', '번지']).agg({
-        '건축년도': lambda x: x.mode()[0] if not x.mode().empty else None,
-        '본번': lambda x: x.mode()[0] if not x.mode().empty else None,
-        '부번': lambda x: x.mode()[0] if not x.mode().empty else None
-    }).reset_index()
-    
-    final_lookup = {}
-    for _, row in grouped.iterrows():
-        key = (row['시군구'], str(row['번지']))
-        final_lookup[key] = {
-            '건축년도': row['건축년도'],
-            '본번': row['본번'],
-            '부번': row['부번']
-        }
-        
-    print(f"총 {len(final_lookup)}개의 지번 키 생성 완료.")
-    return final_lookup
+def _group_mode(df, keys, col):
+    """그룹별 최빈값을 구합니다. 동률이면 가장 작은 값 (Series.mode()[0]과 동일)."""
+    counts = df.groupby(keys + [col]).size().reset_index(name='_count')
+    # groupby 결과는 (keys, col) 오름차순이므로 안정 정렬 후 첫 행이 '최빈값 중 가장 작은 값'
+    counts = counts.sort_values('_count', ascending=False, kind='stable').drop_duplicates(keys)
+    return counts.set_index(keys)[col]
+
+def build_road_lookup_table(sales_df):
+    """
+    도로명 조회키(공백 제거한 도로명)별 건축년도/시군구/본번/부번 테이블을 만듭니다.
+    - 건축년도: 고유값이 하나면 그 값, 여러 개면 고유값 평균의 올림
+    - 시군구/본번/부번: 고유값 중 가장 작은 값 (고유값 목록의 mode()[0]과 동일)
+    :return: '조회키' 인덱스의 DataFrame
+    """
+    lookup_df = sales_df.dropna(subset=['도로명', '건축년도', '시군구', '본번', '부번'])
+    lookup_df = lookup_df.assign(조회키=lookup_df['도로명'].astype(object).str.replace(' ', '', regex=False))
+    lookup_df = lookup_df.dropna(subset=['조회키'])
+
+    years = (lookup_df.drop_duplicates(['조회키', '건축년도'])
+             .groupby('조회키')['건축년도'].agg(['first', 'mean', 'size']))
+    table = lookup_df.groupby('조회키')[['시군구', '본번', '부번']].min()
+    table.insert(0, '건축년도', years['first'].where(years['size'] == 1, np.ceil(years['mean'])))
+    return table
+
+def build_lot_lookup_table(sales_df):
+    """
+    (시군구, 번지)별 건축년도/본번/부번의 최빈값 테이블을 만듭니다. (번지는 문자열)
+    :return: 시군구, 번지, 건축년도, 본번, 부번 컬럼의 DataFrame
+    """
+    lookup_df = sales_df.dropna(subset=['시군구', '번지', '건축년도', '본번', '부번'])
+    keys = ['시군구', '번지']
+    table = pd.concat([_group_mode(lookup_df, keys, c) for c in ['건축년도', '본번', '부번']], axis=1).reset_index()
+    table['번지'] = table['번지'].astype(str)
+    return table.drop_duplicates(keys, keep='last').reset_index(drop=True)
 
 # --- 2. 경매 데이터 파싱 함수들 ---
 
+# 주소 파싱 패턴 (parse_addresses에서 사용)
+ROAD_TYPE_PATTERN = re.compile(r'\s\S+(?:대로|로|길)\s')
+# 도로명 주소: [시군구] 도로명 [건물번호] [나머지] (첫 번째 '~로/~길' 단어 기준)
+ROAD_ADDRESS_PATTERN = re.compile(
+    r'^(?:(?P<시군구>\S+(?: \S+)*?) )??(?P<도로명>\S*(?:로|길))(?= |$)'
+    r'(?: (?P<건물번호>[\d-]*\d[\d-]*)(?:[,(]\S*)?(?= |$))?'
+    r'(?: (?P<나머지주소>.*))?$'
+)
+# 지번 주소: 시군구 번지 [나머지] (두 번째 이후의 첫 번째 '123' 또는 '123-4' 단어 기준)
+LOT_ADDRESS_PATTERN = re.compile(
+    r'^(?P<시군구>\S+(?: \S+)*?) (?P<번지>\d+(?:-\d+)?)(?= |$)(?: (?P<나머지주소>.*))?$'
+)
+FLOOR_PATTERN = re.compile(r'(\d+)\s*층')
+LAST_UNIT_PATTERN = re.compile(r'(?s).*(?<!\d)(\d+)\s*호')
+PARSED_ADDRESS_COLUMNS = ['주소유형', '시군구', '번지', '도로명주소', '나머지주소', '층']
+
+# classify_address_type / extract_floor_from_string / parse_full_address는 행 단위 기준 구현입니다.
+# (parse_addresses 결과 검증용, python preprocess.py --check-parsing)
 def classify_address_type(location_str):
     if isinstance(location_str, str) and re.search(r'\s\S+(?:대로|로|길)\s', location_str):
         return '도로명 주소'
@@ -124,54 +131,129 @@ def parse_full_address(location_str):
     
     return sigungu, bunji, road_addr, remainder, addr_type
 
-# --- 3. 메인 실행 로직 ---
+def extract_floors(texts):
+    """extract_floor_from_string의 벡터화 버전. ('N층' 우선, 없으면 마지막 'N호'의 앞자리, 없으면 0)"""
+    texts = texts.astype(object)
+    floor = texts.str.extract(FLOOR_PATTERN)[0].map(int, na_action='ignore')
+    unit = texts.str.extract(LAST_UNIT_PATTERN)[0]
+    unit_num = unit.map(int, na_action='ignore')
+    unit_floor = unit.str[:-2].where(unit_num >= 100).map(int, na_action='ignore')
+    return floor.fillna(unit_floor).fillna(0).astype(int)
+
+def parse_addresses(locations):
+    """
+    소재지 Series 전체를 한 번에 파싱합니다. (parse_full_address + extract_floor_from_string의 벡터화 버전)
+    :return: locations와 같은 인덱스의 DataFrame
+             (주소유형, 시군구, 번지, 도로명주소, 나머지주소, 층; 해당 없는 값은 None)
+    """
+    locations = locations.astype(object)
+    is_road = locations.str.contains(ROAD_TYPE_PATTERN, na=False)
+    normalized = locations.str.split().str.join(' ')
+
+    parsed = pd.DataFrame(None, index=locations.index, columns=PARSED_ADDRESS_COLUMNS, dtype=object)
+    parsed['주소유형'] = np.where(is_road, '도로명 주소', '지번 주소')
+    parsed['나머지주소'] = locations
+
+    # 도로명 주소
+    road = normalized[is_road].str.extract(ROAD_ADDRESS_PATTERN)
+    matched = road['도로명'].notna()
+    road_addr = road['도로명'].where(road['건물번호'].isna(), road['도로명'] + ' ' + road['건물번호'])
+    idx = road.index[matched]
+    parsed.loc[idx, '시군구'] = road.loc[matched, '시군구'].fillna('')
+    parsed.loc[idx, '도로명주소'] = road_addr[matched]
+    parsed.loc[idx, '나머지주소'] = road.loc[matched, '나머지주소'].fillna('')
+
+    # 지번 주소 (번지를 찾지 못하면 소재지 전체를 시군구로 사용)
+    lot = normalized[~is_road].str.extract(LOT_ADDRESS_PATTERN)
+    matched = lot['번지'].notna()
+    parsed.loc[lot.index, '시군구'] = lot['시군구'].where(matched, locations[lot.index])
+    idx = lot.index[matched]
+    parsed.loc[idx, '번지'] = lot.loc[matched, '번지']
+    parsed.loc[idx, '나머지주소'] = lot.loc[matched, '나머지주소'].fillna('')
+
+    parsed = parsed.where(parsed.notna(), None)
+    parsed['층'] = extract_floors(parsed['나머지주소'])
+    return parsed
+
+def check_address_parsing(locations):
+    """parse_addresses 결과를 행 단위 기준 구현(parse_full_address)과 비교하고, 불일치 행을 반환합니다."""
+    locations = locations[locations.map(lambda x: isinstance(x, str))]
+    parsed = parse_addresses(locations)
+    expected = []
+    for location in locations:
+        sigungu, bunji, road_addr, remainder, addr_type = parse_full_address(location)
+        expected.append((addr_type, sigungu, bunji, road_addr, remainder, extract_floor_from_string(remainder)))
+    expected = pd.DataFrame(expected, index=locations.index, columns=PARSED_ADDRESS_COLUMNS)
+    mismatch = [tuple(a) != tuple(b) for a, b in zip(parsed.itertuples(index=False), expected.itertuples(index=False))]
+    return pd.concat([locations[mismatch], parsed[mismatch].add_suffix('(벡터화)'), expected[mismatch]], axis=1)
+
+# --- 3. 매매 데이터 매핑 ---
+
+MAPPED_COLUMNS = ['건축년도', '시군구', '본번', '부번']
+MATCH_ROAD = '도로명'
+MATCH_LOT = '지번'
+
+def map_addresses(parsed, road_table, lot_table):
+    """
+    파싱된 주소를 조회 테이블과 조인하여 매매 데이터 정보를 붙입니다.
+    - 도로명 주소는 조회키(공백 제거한 도로명주소)로 먼저 조인
+    - 매칭되지 않은 행은 (시군구, 번지)로 조인하며, 이때 시군구는 파싱된 값을 사용
+    :param parsed: parse_addresses 결과
+    :return: parsed와 같은 인덱스의 DataFrame (건축년도, 시군구, 본번, 부번, 층, 매칭방식)
+             매칭방식은 '도로명', '지번' 또는 None (매칭 실패)
+    """
+    # 1) 도로명 조인
+    road_key = (parsed['도로명주소'].where(parsed['주소유형'] == '도로명 주소')
+                .astype(object).str.replace(' ', '', regex=False))
+    road = road_table.reindex(road_key.to_numpy())
+    road.index = parsed.index
+    road_hit = road_key.isin(road_table.index)
+
+    # 2) (시군구, 번지) 조인
+    lot_keys = pd.MultiIndex.from_arrays([parsed['시군구'], parsed['번지']])
+    lot = lot_table.set_index(['시군구', '번지']).reindex(lot_keys)
+    lot.index = parsed.index
+    lot['시군구'] = parsed['시군구']
+    lot_hit = ~road_hit & lot['건축년도'].notna() & parsed['시군구'].fillna('').ne('')
+
+    # 3) 도로명 결과 우선으로 병합
+    mapped = pd.DataFrame(None, index=parsed.index, columns=MAPPED_COLUMNS, dtype=object)
+    mapped.loc[road_hit, MAPPED_COLUMNS] = road.loc[road_hit, MAPPED_COLUMNS]
+    mapped.loc[lot_hit, MAPPED_COLUMNS] = lot.loc[lot_hit, MAPPED_COLUMNS]
+    mapped = mapped.infer_objects()
+    mapped['층'] = parsed['층']
+    mapped['매칭방식'] = np.select([road_hit, lot_hit], [MATCH_ROAD, MATCH_LOT], default=None)
+    return mapped
+
+# --- 4. 메인 실행 로직 ---
+def load_auction_df():
+    # merge_auction_data.py로 만든 데이터셋이 있으면 사용하고, 없으면 합본 CSV를 읽습니다.
+    if os.path.isdir(auction_dataset_dir):
+        return load_auction_data()
+    return pd.read_csv(auction_file)
+
 def main():
     print("데이터 파일을 로드합니다...")
-    sales_df = pd.read_csv(sales_file, encoding='utf-8')
-    auction_df = pd.read_csv(auction_file)
-    si_code_df = pd.read_csv(si_code_file)
+    sales_df = read_table(sales_file, encoding='utf-8')
+    auction_df = load_auction_df()
+    bjd_index = load_bjd_index(si_code_file, index_path=bjd_index_file)
     print("로드 완료.")
 
-    # 1. 두 종류의 조회 딕셔너리 생성
-    road_lookup = create_road_address_lookup(sales_df)
-    lot_lookup = create_lot_address_lookup(sales_df)
-
-    # 2. 최종 매핑 함수 정의
-    def get_all_info(location_str):
-        sigungu_parsed, bunji_parsed, road_addr_parsed, remainder, addr_type = parse_full_address(location_str)
-        floor = extract_floor_from_string(remainder)
-        
-        mapped_info = None
-        
-        if addr_type == '도로명 주소':
-            if road_addr_parsed:
-                key = road_addr_parsed.replace(' ', '')
-                if key in road_lookup:
-                    mapped_info = road_lookup[key]
-        
-        if mapped_info is None and sigungu_parsed and bunji_parsed:
-            lot_key = (sigungu_parsed, bunji_parsed)
-            if lot_key in lot_lookup:
-                mapped_info = lot_lookup[lot_key]
-                mapped_info['시군구'] = sigungu_parsed
-        
-        if mapped_info:
-            return pd.Series({
-                '건축년도': mapped_info.get('건축년도'),
-                '시군구': mapped_info.get('시군구'),
-                '본번': mapped_info.get('본번'),
-                '부번': mapped_info.get('부번'),
-                '층': floor
-            })
-        else:
-            return pd.Series({
-                '건축년도': None, '시군구': None,
-                '본번': None, '부번': None, '층': floor
-            })
-
-    # 3. 전체 데이터에 매핑 적용
+    # 1. 두 종류의 조회 테이블 생성
+    print("도로명 주소용 조회 테이블을 생성합니다...")
+    road_table = build_road_lookup_table(sales_df)
+    print(f"총 {len(road_table)}개의 도로명 키 생성 완료.")
+    print("지번 주소용 조회 테이블을 생성합니다...")
+    lot_table = build_lot_lookup_table(sales_df)
+    print(f"총 {len(lot_table)}개의 지번 키 생성 완료.")
+
+    # 2. 소재지 일괄 파싱
+    print("\n소재지를 파싱합니다...")
+    parsed = parse_addresses(auction_df['소재지'])
+
+    # 3. 전체 데이터에 매핑 적용 (도로명 조인 -> 지번 조인)
     print("\n최종 하이브리드 로직으로 전체 데이터 매핑을 시작합니다...")
-    mapped_results_df = auction_df['소재지'].apply(get_all_info)
+    mapped_results_df = map_addresses(parsed, road_table, lot_table)
     
     # 원본 auction_df에서 중복될 수 있는 컬럼 제거 후 병합
     cols_to_drop = [col for col in mapped_results_df.columns if col in auction_df.columns]
@@ -183,10 +265,8 @@ def main():
 
     # 5. 법정동코드 매핑 추가
     print("법정동코드를 매핑합니다...")
-    si_code_to_merge = si_code_df[['법정동명', '법정동코드']].drop_duplicates()
-    # '시군구' 컬럼을 기준으로 병합
-    preprocessed_df = pd.merge(preprocessed_df, si_code_to_merge, left_on='시군구', right_on='법정동명', how='left')
-    preprocessed_df.drop(columns=['법정동명'], inplace=True) # 중복 컬럼 제거
+    # '시군구' 컬럼을 기준으로 조회 (폐지되지 않은 코드만, 중복 시 첫 번째 코드 사용)
+    preprocessed_df['법정동코드'] = map_bjd_codes(preprocessed_df['시군구'], bjd_index)
 
     # 6. 결과 집계 및 보고
     total_original_count = len(auction_df)
@@ -197,10 +277,21 @@ def main():
     print(f"총 원본 데이터: {total_original_count}건")
     print(f"매핑 성공 및 필터링된 데이터: {total_processed_count}건")
     print(f"최종 데이터 성공률: {success_rate:.2f}%")
+    for source in [MATCH_ROAD, MATCH_LOT]:
+        count = (final_df['매칭방식'] == source).sum()
+        print(f"- {source} 매칭: {count}건 ({count / total_original_count * 100:.2f}%)")
 
     # 7. 결과 파일 저장
     preprocessed_df.to_csv(output_file, index=False, encoding='utf-8-sig')
     print(f"\n최종 전처리된 데이터를 '{output_file}'에 저장했습니다.")
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    if '--check-parsing' in sys.argv:
+        # 벡터화 파싱 결과를 행 단위 기준 구현과 비교
+        mismatches = check_address_parsing(load_auction_df()['소재지'])
+        print(f"파싱 불일치: {len(mismatches)}건")
+        if len(mismatches):
+            print(mismatches.head(20).to_string())
+            sys.exit(1)
+    else:
+        main()
\ No newline at end of file
@@ -0,0 +1,110 @@
+"""
+Crawler end-of-results handling, run against fixture pages through the crawl() hooks
+(base_url_for_state / driver_factory) instead of a real browser.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+crawler = pytest.importorskip("Crawling_Auction_Madang")
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+NO_RESULTS_CLASS = "fixture_no_results"   # marker class of no_results_page.html
+STATE = 40
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+# Elements WebDriverWait looks for on each kind of page
+LISTING = {(By.CSS_SELECTOR, crawler.RESULT_LIST_SELECTOR)}
+NO_RESULTS = {(By.CLASS_NAME, NO_RESULTS_CLASS)}
+STILL_LOADING = set()
+
+class FakeElement:
+    def is_displayed(self):
+        return True
+
+class FakeDriver:
+    """Serves fixture pages by URL; find_element answers from the elements declared for the page."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.page_source = ""
+        self._present = set()
+
+    def get(self, url):
+        self.page_source, self._present = self.pages[url]
+
+    def find_element(self, by, value):
+        if (by, value) in self._present:
+            return FakeElement()
+        raise NoSuchElementException(value)
+
+    def quit(self):
+        pass
+
+def base_url(state_code):
+    return f"fixture://{state_code}/{{page}}"
+
+def run_crawl(tmp_path, pages_by_num, max_page=120, no_results_class=NO_RESULTS_CLASS):
+    pages = {base_url(STATE).format(page=n): page for n, page in pages_by_num.items()}
+    crawler.crawl(
+        [(STATE, max_page)], num_workers=1, max_retries=2, retry_backoff=0, page_delay=0,
+        base_url_for_state=base_url, driver_factory=lambda url: FakeDriver(pages),
+        no_results_class=no_results_class, output_root=str(tmp_path),
+    )
+    manifest = crawler.CrawlManifest(os.path.join(str(tmp_path), crawler.MANIFEST_FILE))
+    try:
+        return {status: manifest.pages_with_status(STATE, (status,)) for status in ("done", "empty", "failed")}
+    finally:
+        manifest.close()
+
+@pytest.fixture(autouse=True)
+def short_timeout(monkeypatch):
+    monkeypatch.setattr(crawler, "PAGE_LOAD_TIMEOUT", 0.05)
+
+def test_no_results_marker_ends_the_state(tmp_path):
+    listing, empty = read_fixture("results_page.html"), read_fixture("no_results_page.html")
+    status = run_crawl(tmp_path, {0: (listing, LISTING), 60: (empty, NO_RESULTS), 120: (listing, LISTING)})
+    assert status == {"done": {0}, "empty": {60}, "failed": set()}
+
+def test_timeout_is_retried_and_does_not_end_the_state(tmp_path):
+    listing = read_fixture("results_page.html")
+    status = run_crawl(tmp_path, {0: (listing, LISTING), 60: ("<html><body></body></html>", STILL_LOADING),
+                                  120: (listing, LISTING)})
+    assert status == {"done": {0, 120}, "empty": set(), "failed": {60}}
+
+def test_parse_failure_is_retried_and_does_not_end_the_state(tmp_path):
+    listing = read_fixture("results_page.html")
+    status = run_crawl(tmp_path, {0: (listing, LISTING), 60: ("", LISTING), 120: (listing, LISTING)})
+    assert status == {"done": {0, 120}, "empty": set(), "failed": {60}}
+
+def test_empty_page_without_configured_marker_is_a_failure(tmp_path):
+    listing, empty = read_fixture("results_page.html"), read_fixture("no_results_page.html")
+    status = run_crawl(tmp_path, {0: (listing, LISTING), 60: (empty, LISTING), 120: (listing, LISTING)},
+                       no_results_class=None)
+    assert status == {"done": {0, 120}, "empty": set(), "failed": {60}}
+
+def test_rerun_resumes_after_the_end_page(tmp_path):
+    listing, empty = read_fixture("results_page.html"), read_fixture("no_results_page.html")
+    pages = {0: (listing, LISTING), 60: (empty, NO_RESULTS), 120: (listing, LISTING)}
+    run_crawl(tmp_path, pages)
+    # The archived page still shows the marker, so the second run stops at the same page
+    status = run_crawl(tmp_path, pages, max_page=180)
+    assert status == {"done": {0}, "empty": {60}, "failed": set()}
+
+def test_parse_page_reads_the_fixture_listings():
+    rows = crawler.parse_page(read_fixture("results_page.html"))
+    assert [r["소재지"] for r in rows] == [
+        "서울특별시 강남구 개포동 12 개포아파트 101동 3층 301호",
+        "부산광역시 해운대구 우동 1407 우동아파트 2층 201호",
+    ]
+    assert rows[0]["건물면적"] == "84.97" and rows[0]["토지면적"] == "40.12"
+    assert rows[0]["최저가"] == "960000000" and rows[0]["낙찰가"] is None
+    assert rows[1]["낙찰가"] == "512300000" and rows[1]["유찰횟수"] == "N/A"
+    assert rows[0]["유찰횟수"] == 1 and rows[0]["기타정보"] == ["대항력", "선순위"]
@@ -0,0 +1,43 @@
+"""
+parse_page (lxml) must return exactly what the original BeautifulSoup parser returned:
+on the fixture pages, and on every real page saved in the crawler's html_archive when one exists.
+"""
+import os
+import sys
+
+import pytest
+
+DATA_MADANG_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.append(DATA_MADANG_DIR)
+crawler = pytest.importorskip("Crawling_Auction_Madang")
+benchmark = pytest.importorskip("benchmark_parse_page")
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+ARCHIVE_PATH = os.path.join(DATA_MADANG_DIR, benchmark.DEFAULT_CORPUS_DIR)
+
+FIXTURE_PAGES = benchmark.load_corpus(FIXTURE_DIR)
+
+def archived_pages():
+    return benchmark.load_corpus(ARCHIVE_PATH) if os.path.isdir(ARCHIVE_PATH) else []
+
+@pytest.mark.parametrize("html", [html for _, html in FIXTURE_PAGES], ids=[name for name, _ in FIXTURE_PAGES])
+def test_fixture_pages_match_bs4(html):
+    assert crawler.parse_page(html) == benchmark.parse_page_bs4(html)
+
+def test_table_inside_listing_is_parsed():
+    with open(os.path.join(FIXTURE_DIR, "results_page_table.html"), encoding="utf-8") as f:
+        rows = crawler.parse_page(f.read())
+    assert [r["소재지"] for r in rows] == [
+        "인천광역시 연수구 송도동 23-1 송도아파트 12층 1203호",
+        "경기도 수원시 영통구 매탄동 100 매탄아파트 5층 502호",
+        "대전광역시 서구 둔산동 1000 둔산아파트 8층 801호",
+    ]
+    assert rows[0]["건물면적"] == "101.2" and rows[0]["최저가"] == "490000000" and rows[0]["유찰횟수"] == 2
+    assert rows[1]["건물면적"] == "59.9" and rows[1]["낙찰가"] == "401000000"
+
+def test_archived_real_pages_match_bs4():
+    pages = archived_pages()
+    if not pages:
+        pytest.skip(f"no archived pages in {ARCHIVE_PATH}")
+    mismatched = [name for name, html in pages if crawler.parse_page(html) != benchmark.parse_page_bs4(html)]
+    assert not mismatched, f"{len(mismatched)} of {len(pages)} pages differ: {mismatched[:10]}"
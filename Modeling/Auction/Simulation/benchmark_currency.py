@@ -0,0 +1,90 @@
+"""
+금액 문자열 파서 마이크로 벤치마크
+- 기존 korean_currency_to_float(Series.apply)와 korean_currency_series_to_float의
+  결과 일치 여부와 실행 시간을 비교합니다.
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# data_utils.py 불러오기
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+import data_utils
+
+DATA_PATH = "../Data_Madang/auction_preprocessed.csv"
+CURRENCY_COLS = ["감정가", "최저가", "낙찰가"]
+N_SYNTHETIC = 300000
+N_REPEAT = 3
+RANDOM_STATE = 42
+
+def make_synthetic_values(n, seed=RANDOM_STATE):
+    """크롤링 데이터와 비슷한 형식의 금액 문자열을 생성합니다. (비정형 값 포함)"""
+    rng = np.random.default_rng(seed)
+    eok = rng.integers(0, 30, n)
+    man = rng.integers(0, 10000, n)
+    won = rng.integers(1000, 99999999, n)
+    kind = rng.integers(0, 4, n)
+
+    values = []
+    for e, m, w, k in zip(eok, man, won, kind):
+        if k == 0:
+            values.append(f"{e}억 {m:,}만원" if e else f"{m:,}만원")
+        elif k == 1:
+            values.append(f"{e}억원" if e else f"{w:,}원")
+        elif k == 2:
+            values.append(f"{w:,}")
+        else:
+            values.append(f"{e}억{m}")
+    odd_values = ["", "nan", "N/A", "만", "억", "3억 5000만 2000", None, np.nan, "1.5억", " 7,000 만원 "]
+    values[:len(odd_values)] = odd_values
+    return pd.Series(values, dtype=object)
+
+def load_values(base_dir):
+    """실제 경매 데이터의 금액 컬럼을 불러오고, 없으면 합성 데이터를 사용합니다."""
+    path = os.path.join(base_dir, DATA_PATH)
+    try:
+        df = pd.read_csv(path, dtype=str)
+        cols = [c for c in CURRENCY_COLS if c in df.columns]
+        if cols:
+            print(f"[INFO] 실제 데이터 사용: {path}")
+            return pd.concat([df[c] for c in cols], ignore_index=True)
+    except (FileNotFoundError, pd.errors.ParserError):
+        pass
+    print(f"[INFO] 실제 데이터를 찾을 수 없어 합성 데이터 {N_SYNTHETIC}건을 사용합니다.")
+    return make_synthetic_values(N_SYNTHETIC)
+
+def best_time(func, values):
+    """N_REPEAT회 실행 중 가장 빠른 시간과 결과를 반환합니다."""
+    best, result = float("inf"), None
+    for _ in range(N_REPEAT):
+        start = time.perf_counter()
+        result = func(values)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+def main():
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    values = load_values(base_dir)
+    print(f"[INFO] 값 개수: {len(values)} (고유값 {values.nunique(dropna=False)}개)")
+
+    t_old, old = best_time(lambda v: v.apply(data_utils.korean_currency_to_float).astype(np.float64), values)
+    t_new, new = best_time(data_utils.korean_currency_series_to_float, values)
+
+    old_arr = old.to_numpy()
+    new_arr = new.to_numpy()
+    mismatch = ~((old_arr == new_arr) | (np.isnan(old_arr) & np.isnan(new_arr)))
+
+    print("\n--- 금액 파서 벤치마크 ---")
+    print(f"기존 (apply):      {t_old * 1000:,.1f} ms")
+    print(f"벡터화 + 메모이제이션: {t_new * 1000:,.1f} ms")
+    print(f"속도 향상:          {t_old / t_new:.1f}x")
+    if mismatch.any():
+        print(f"[오류] 결과 불일치 {mismatch.sum()}건")
+        print(pd.DataFrame({"value": values[mismatch], "old": old_arr[mismatch], "new": new_arr[mismatch]}).head(20))
+        sys.exit(1)
+    print("결과 일치: 모든 값이 동일합니다.")
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,8 @@
 - 데이터 로드, 정제, 증강, 피처 엔지니어링, 학습 데이터 준비
 """
 import os
+import re
+import hashlib
 import numpy as np
 import pandas as pd
 from sklearn.preprocessing import StandardScaler
@@ -11,6 +13,10 @@ from sklearn.impute import SimpleImputer
 # --- 유틸리티 함수 ---
 R_AVG = 0.7295 # 데이터 기반 평균 r값
 
+# 정제/증강/피처 로직이 바뀌면 올려서 기존 데이터셋 캐시를 무효화합니다.
+DATA_UTILS_VERSION = 2
+DATASET_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+
 def parse_date(s):
     """날짜 형식의 문자열을 datetime 객체로 변환합니다."""
     try:
@@ -28,6 +34,18 @@ def get_rule_based_r(location_str):
     else:
         return 0.7
 
+def get_rule_based_r_array(locations):
+    """소재지 Series 전체에 대해 규칙 기반 r값을 배열로 반환합니다. (get_rule_based_r의 벡터화 버전)"""
+    loc = pd.Series(locations)
+    if not (pd.api.types.is_object_dtype(loc) or pd.api.types.is_string_dtype(loc)):
+        return np.full(len(loc), R_AVG)
+
+    # 문자열이 아닌 값은 contains 결과가 NaN이 되므로 R_AVG로 처리
+    matched = loc.str.contains('서울|부산', regex=True)
+    is_missing = matched.isna().to_numpy()
+    is_high = matched.fillna(False).astype(bool).to_numpy()
+    return np.where(is_missing, R_AVG, np.where(is_high, 0.8, 0.7))
+
 def calculate_item_specific_r(appraisal_price, min_price, num_failure_rounds):
     """
     개별 경매 건의 감정가, 최저가, 유찰횟수를 기반으로 동적 저감율(r)을 계산합니다.
@@ -45,6 +63,16 @@ def calculate_item_specific_r(appraisal_price, min_price, num_failure_rounds):
     except (ValueError, OverflowError):
         return R_AVG
 
+def _scalar_pow(base, exponent):
+    """
+    원소별 거듭제곱을 파이썬 float 연산(libm pow)으로 계산합니다.
+    np.power는 SIMD 구현을 쓰는 경우가 있어 기존 행 단위 루프와 1 ULP 차이가 날 수 있으므로,
+    루프와 같은 값이 필요한 곳(augment_data)에서 사용합니다.
+    """
+    base = np.asarray(base, dtype=np.float64)
+    exponent = np.asarray(exponent)
+    return np.fromiter(map(pow, base.tolist(), exponent.tolist()), dtype=np.float64, count=base.size)
+
 def calc_min_price_by_round(appraisal_price, round_k, location_str):
     """유찰 회차와 지역에 따른 최저입찰가를 계산합니다."""
     if pd.isna(appraisal_price):
@@ -69,6 +97,39 @@ def korean_currency_to_float(s):
     except (ValueError, IndexError):
         return np.nan
 
+# '[N억] [N만 | N]' 형태의 정형화된 금액 문자열 패턴 (',', '원' 제거 후)
+CURRENCY_PATTERN = re.compile(
+    r"^\s*(?:(?P<eok>[0-9]+(?:\.[0-9]+)?)\s*억)?\s*(?:(?P<man>[0-9]+(?:\.[0-9]+)?)\s*만|(?P<won>[0-9]+(?:\.[0-9]+)?))?\s*$"
+)
+
+def korean_currency_series_to_float(values):
+    """
+    금액 문자열 Series 전체를 숫자로 변환합니다. (korean_currency_to_float의 벡터화 버전)
+    - 중복 값은 한 번만 파싱하고 (factorize), 정형화된 값은 정규식 추출로 한 번에 계산합니다.
+    - 패턴에 맞지 않는 값만 korean_currency_to_float로 개별 처리하여 결과를 동일하게 유지합니다.
+    """
+    s = pd.Series(values)
+    codes, uniques = pd.factorize(s)
+    if len(uniques) == 0:
+        return pd.Series(np.nan, index=s.index, dtype=np.float64)
+
+    texts = (pd.Series(uniques, dtype=object).astype(str)
+             .str.replace(',', '', regex=False)
+             .str.replace('원', '', regex=False)
+             .str.strip())
+    parts = texts.str.extract(CURRENCY_PATTERN)
+    matched = parts.notna().any(axis=1).to_numpy()
+
+    numbers = parts.astype(np.float64).fillna(0).to_numpy()
+    parsed = numbers[:, 0] * 100000000 + numbers[:, 1] * 10000 + numbers[:, 2]
+
+    # 패턴에 맞지 않는 값은 기존 함수로 처리
+    for i in np.flatnonzero(~matched):
+        parsed[i] = korean_currency_to_float(uniques[i])
+
+    result = np.where(codes >= 0, parsed[codes], np.nan)
+    return pd.Series(result, index=s.index, dtype=np.float64)
+
 # --- 데이터 처리 파이프라인 함수 ---
 
 def load_and_clean(path):
@@ -84,7 +145,7 @@ def load_and_clean(path):
     numeric_cols = ["건물면적", "토지면적", "건축년도", "유찰횟수", "층", "법정동코드"]
     
     for col in currency_cols:
-        if col in df.columns: df[col] = df[col].apply(korean_currency_to_float)
+        if col in df.columns: df[col] = korean_currency_series_to_float(df[col])
     for col in numeric_cols:
         if col in df.columns: df[col] = pd.to_numeric(df[col], errors='coerce')
     
@@ -109,40 +170,61 @@ def augment_data(df):
     최종 결과물은 (생성된 가상 유찰 데이터) + (원본 낙찰 성공 데이터)로 구성됩니다.
     """
     print(f"[INFO] 원본 데이터 크기: {len(df)}")
-    augmented_rows = []
-
-    for _, row in df.iterrows():
-        failure_rounds = int(row.get('유찰횟수', 0))
-        appraisal_price = row.get('감정가')
-
-        # 1. 증강 대상 선정: 유찰 횟수가 1 이상이고, 감정가가 있는 데이터
-        if failure_rounds > 0 and pd.notna(appraisal_price):
-            
-            # 2. 저감율(r) 결정: 조건부 로직 적용
-            rule_based_r = get_rule_based_r(row.get('소재지'))
-            # 규칙 기반으로 마지막 유찰 회차의 최저가를 예측해봄
-            rule_based_final_min_price = appraisal_price * (rule_based_r ** failure_rounds)
-            
-            use_r = rule_based_r # 기본적으로 규칙 기반 r 사용
-            
-            # 규칙 기반 예측이 실제 최저가보다 낮아 비현실적일 경우, 동적 r로 전환
-            if rule_based_final_min_price < row.get('최저가', float('inf')):
-                use_r = calculate_item_specific_r(appraisal_price, row.get('최저가'), failure_rounds)
-
-            # 3. 가상 유찰 데이터 생성
-            for k in range(failure_rounds):
-                new_row = row.copy()
-                new_row['유찰횟수'] = k
-                # 결정된 use_r을 사용하여 최저가 계산
-                new_row['최저가'] = appraisal_price * (use_r ** k)
-                new_row['label'] = 0  # 가상 데이터는 항상 실패(label=0)
-                augmented_rows.append(new_row)
-
-        # 4. 원본 데이터 처리: label이 1인(낙찰 성공) 데이터만 최종 결과에 포함
-        if row.get('label') == 1:
-            augmented_rows.append(row)
-            
-    augmented_df = pd.DataFrame(augmented_rows).reset_index(drop=True)
+    n = len(df)
+    nan_col = pd.Series(np.nan, index=df.index)
+
+    failure_rounds = df['유찰횟수'].fillna(0).astype(int).to_numpy() if '유찰횟수' in df.columns else np.zeros(n, dtype=int)
+    appraisal = df.get('감정가', nan_col).to_numpy(dtype=np.float64)
+    min_price = df.get('최저가', nan_col).to_numpy(dtype=np.float64)
+
+    # 1. 증강 대상 선정: 유찰 횟수가 1 이상이고, 감정가가 있는 데이터
+    target = (failure_rounds > 0) & ~np.isnan(appraisal)
+    safe_rounds = np.where(target, failure_rounds, 1)
+
+    # 2. 저감율(r) 결정: 조건부 로직 적용
+    # 거듭제곱은 _scalar_pow로 계산하여 기존 행 단위 루프와 같은 값을 냅니다. (곱셈 순서도 루프와 동일)
+    rule_based_r = get_rule_based_r_array(df['소재지']) if '소재지' in df.columns else np.full(n, R_AVG)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        # 규칙 기반으로 마지막 유찰 회차의 최저가를 예측해봄 (증강 대상 행만 사용됨)
+        rule_based_final_min_price = np.full(n, np.nan)
+        rule_based_final_min_price[target] = appraisal[target] * _scalar_pow(rule_based_r[target], failure_rounds[target])
+
+        # 동적 r (calculate_item_specific_r의 벡터화 버전)
+        base_ratio = min_price / appraisal
+        valid_ratio = target & ~np.isnan(min_price) & (appraisal != 0) & (base_ratio > 0)
+        item_specific_r = np.full(n, R_AVG)
+        item_specific_r[valid_ratio] = np.clip(
+            _scalar_pow(base_ratio[valid_ratio], 1 / safe_rounds[valid_ratio]), 0.01, 0.99
+        )
+
+    # 규칙 기반 예측이 실제 최저가보다 낮아 비현실적일 경우, 동적 r로 전환 (최저가 결측 시 비교 결과는 False)
+    compare_min_price = min_price if '최저가' in df.columns else np.full(n, np.inf)
+    use_r = np.where(rule_based_final_min_price < compare_min_price, item_specific_r, rule_based_r)
+
+    # 3. 행 확장: 건별로 [가상 유찰 데이터 k=0..유찰횟수-1] + [낙찰 성공 원본 데이터] 순서
+    n_virtual = np.where(target, failure_rounds, 0)
+    keep_original = (df['label'] == 1).to_numpy() if 'label' in df.columns else np.zeros(n, dtype=bool)
+    reps = n_virtual + keep_original
+    src_idx = np.repeat(np.arange(n), reps)
+    starts = np.cumsum(reps) - reps
+    k = np.arange(len(src_idx)) - np.repeat(starts, reps)
+    is_virtual = k < n_virtual[src_idx]
+
+    augmented_df = df.iloc[src_idx].reset_index(drop=True)
+    if is_virtual.any():
+        augmented_df['유찰횟수'] = np.where(is_virtual, k, augmented_df['유찰횟수'].to_numpy())
+        # 결정된 use_r을 사용하여 최저가 계산
+        new_min_price = min_price[src_idx]
+        new_min_price[is_virtual] = appraisal[src_idx][is_virtual] * _scalar_pow(
+            use_r[src_idx][is_virtual], k[is_virtual]
+        )
+        augmented_df['최저가'] = new_min_price
+        # 가상 데이터는 항상 실패(label=0)
+        if 'label' in augmented_df.columns:
+            augmented_df['label'] = np.where(is_virtual, 0, augmented_df['label'].to_numpy())
+        else:
+            augmented_df['label'] = 0
+
     print(f"[INFO] 데이터 증강 후 크기: {len(augmented_df)}")
     return augmented_df
 
@@ -166,6 +248,16 @@ def feature_engineer(df):
         
     return df
 
+def category_tables(df, categorical_cols=('bjd_sido', 'bjd_sigungu')):
+    """
+    학습 데이터의 범주형 변수별 범주 목록을 반환합니다.
+    목록의 순서가 곧 학습 시 사용된 코드값이므로, 모델 팩에 함께 저장하여 추론 시 동일한 코드를 사용합니다.
+    """
+    return {
+        c: list(df[c].fillna("NA").astype('category').cat.categories)
+        for c in categorical_cols if c in df.columns
+    }
+
 def prepare_training_data(df):
     """모델 학습을 위한 최종 데이터셋(X, y)을 준비합니다."""
     # 사용할 변수 목록 정의
@@ -192,3 +284,73 @@ def prepare_training_data(df):
     y = df["label"].fillna(0).astype(int)
     
     return X_scaled, y, num_imputer, scaler
+
+# --- 데이터셋 캐시 ---
+
+# 캐시 단계별 처리 (정제된 데이터에 적용)
+DATASET_STAGES = {
+    "clean": lambda df: df,
+    "engineered": lambda df: feature_engineer(df),
+    "augmented": lambda df: feature_engineer(augment_data(define_label(df))),
+}
+
+try:
+    import pyarrow.feather as _feather
+except ImportError: # pyarrow가 없으면 pickle 형식으로 캐시
+    _feather = None
+
+def file_hash(path):
+    """파일 내용의 해시값을 반환합니다. (데이터셋 캐시 키, simulator의 모델 파일 키에 사용)"""
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+def _read_cache(cache_path):
+    if _feather is not None:
+        return _feather.read_table(cache_path, memory_map=True).to_pandas()
+    return pd.read_pickle(cache_path)
+
+def _write_cache(df, cache_path):
+    tmp_path = cache_path + ".tmp"
+    if _feather is not None:
+        _feather.write_feather(df.reset_index(drop=True), tmp_path)
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, cache_path)
+
+def load_dataset(path, stage="clean", cache_dir=DATASET_CACHE_DIR):
+    """
+    load_and_clean 결과(및 증강/피처 엔지니어링 단계)를 캐시하여 불러옵니다.
+    - 캐시 키: 원본 파일 해시 + DATA_UTILS_VERSION + 단계 이름
+    - 캐시 형식: pyarrow가 있으면 Feather(메모리 맵 로드), 없으면 pickle
+    :param stage: 'clean' (load_and_clean), 'engineered' (+ feature_engineer),
+                  'augmented' (+ define_label, augment_data, feature_engineer)
+    :param cache_dir: 캐시 폴더. None이면 캐시 없이 매번 CSV를 파싱합니다.
+    """
+    if stage not in DATASET_STAGES:
+        raise ValueError(f"알 수 없는 단계입니다: {stage} (가능한 값: {list(DATASET_STAGES)})")
+    if not os.path.exists(path):
+        print(f"[오류] 파일을 찾을 수 없습니다: {path}")
+        return None
+    if cache_dir is None:
+        df = load_and_clean(path)
+        return None if df is None else DATASET_STAGES[stage](df)
+
+    ext = "feather" if _feather is not None else "pkl"
+    key = f"{file_hash(path)}_v{DATA_UTILS_VERSION}"
+    cache_path = os.path.join(cache_dir, f"dataset_{key}_{stage}.{ext}")
+    if os.path.exists(cache_path):
+        print(f"[INFO] 캐시된 데이터셋 로드: {os.path.basename(cache_path)}")
+        return _read_cache(cache_path)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    if stage == "clean":
+        df = load_and_clean(path)
+        if df is None: return None
+    else:
+        df = DATASET_STAGES[stage](load_dataset(path, "clean", cache_dir))
+    _write_cache(df, cache_path)
+    print(f"[INFO] 데이터셋 캐시 저장: {os.path.basename(cache_path)}")
+    return df
@@ -0,0 +1,106 @@
+"""
+저장된 모델 팩(model/imputer/scaler/features)의 전처리를 NumPy 연산으로 컴파일한 래퍼
+- 숫자형 결측치 대체(median), 범주형 코드화, 컬럼 정렬, 스케일링을 미리 계산된 배열로 수행합니다.
+"""
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+
+class ModelPack:
+    """
+    학습 스크립트가 저장한 모델 팩을 감싸 전처리 체인을 한 번에 수행합니다.
+    - transform(): 원본 피처(DataFrame 또는 features 순서의 배열)를 모델 입력(float32 연속 배열)으로 변환
+    - predict(): transform 후 예측 (분류기는 양성 클래스 확률, 회귀 모델은 예측값)
+    """
+
+    def __init__(self, pack):
+        self.model = pack["model"]
+        self.imputer = pack["imputer"]
+        self.scaler = pack["scaler"]
+        self.features = list(pack["features"])
+
+        # 컬럼 인덱스 맵
+        self.num_cols = list(self.imputer.feature_names_in_)
+        self.cat_cols = [c for c in self.features if c not in self.num_cols]
+        self.col_index = {c: i for i, c in enumerate(self.features)}
+        self.num_idx = np.array([self.col_index[c] for c in self.num_cols], dtype=np.intp)
+        self.cat_idx = np.array([self.col_index[c] for c in self.cat_cols], dtype=np.intp)
+
+        # 결측치 대체값(median) 및 스케일링 벡터 (features 순서)
+        self.fill_values = np.zeros(len(self.features), dtype=np.float64)
+        self.fill_values[self.num_idx] = self.imputer.statistics_
+        self.mean = np.asarray(self.scaler.mean_, dtype=np.float64)
+        self.scale = np.asarray(self.scaler.scale_, dtype=np.float64)
+
+        # 범주형 코드 테이블 (학습 시 저장된 범주 목록 기준)
+        # 범주 목록을 저장하지 않은 예전 모델 팩은 범주형 컬럼의 모든 값을 코드 0으로 고정
+        categories = pack.get("categories") or {}
+        self.category_codes = {
+            c: {value: code for code, value in enumerate(categories[c])}
+            for c in self.cat_cols if c in categories
+        }
+
+        self.is_booster = isinstance(self.model, xgb.Booster)
+        self.is_classifier = hasattr(self.model, "predict_proba")
+
+    @classmethod
+    def load(cls, path):
+        """joblib으로 저장된 모델 팩 파일을 불러와 컴파일합니다."""
+        return cls(joblib.load(path))
+
+    def encode_categories(self, df):
+        """범주형 컬럼을 학습 시와 같은 코드로 변환합니다. 학습 때 없던 값은 -1."""
+        codes = np.zeros((len(df), len(self.cat_cols)), dtype=np.float64)
+        for j, c in enumerate(self.cat_cols):
+            table = self.category_codes.get(c)
+            if table is None or c not in df.columns:
+                continue
+            values = df[c].fillna("NA").astype(str)
+            codes[:, j] = values.map(table).fillna(-1).to_numpy(dtype=np.float64)
+        return codes
+
+    def raw_matrix(self, df):
+        """feature_engineer를 거친 DataFrame에서 features 순서의 원본 피처 행렬을 만듭니다."""
+        X = np.full((len(df), len(self.features)), np.nan, dtype=np.float64)
+        for c in self.num_cols:
+            if c in df.columns:
+                X[:, self.col_index[c]] = df[c].to_numpy(dtype=np.float64)
+        X[:, self.cat_idx] = self.encode_categories(df)
+        return X
+
+    def transform(self, X):
+        """
+        원본 피처를 모델 입력으로 변환합니다.
+        :param X: feature_engineer를 거친 DataFrame, 또는 features 순서의 배열(범주형은 코드값)
+        :return: (n, F) 형태의 C-연속 float32 배열
+        """
+        if isinstance(X, pd.DataFrame):
+            X = self.raw_matrix(X)
+        X = np.asarray(X, dtype=np.float64)
+
+        # 결측치 처리 -> 스케일링
+        X = np.where(np.isnan(X), self.fill_values, X)
+        X = (X - self.mean) / self.scale
+
+        # NaN 값을 허용하지 않는 모델을 위해 최종 단계에서 한번 더 처리
+        X = np.where(np.isnan(X), 0.0, X)
+        return np.ascontiguousarray(X, dtype=np.float32)
+
+    def predict_transformed(self, X):
+        """transform을 마친 배열을 예측합니다."""
+        if self.is_booster:
+            return self.model.predict(xgb.DMatrix(X, feature_names=self.features))
+        if self.is_classifier:
+            return self.model.predict_proba(X)[:, 1]
+        return self.model.predict(X)
+
+    def predict(self, X):
+        """원본 피처를 변환하여 예측합니다. (분류기는 양성 클래스 확률 반환)"""
+        return np.asarray(self.predict_transformed(self.transform(X)), dtype=np.float64)
+
+
+def as_model_pack(pack):
+    """joblib으로 불러온 dict 형태의 모델 팩도 ModelPack으로 변환합니다."""
+    return pack if isinstance(pack, ModelPack) else ModelPack(pack)
@@ -1,13 +1,13 @@
 """
 분류기 3종과 회귀 모델 3종의 모든 조합(3x3=9가지)에 대해 시뮬레이션을 실행하고,
 각 조합의 성능(MAPE)을 비교하여 최적의 조합을 찾습니다.
+분류기별 회차 확률과 회귀 모델별 (건, 회차) 낙찰가 예측은 모델당 한 번만 계산하여 캐시하고,
+M x K 조합은 캐시된 배열로부터 평가합니다.
 """
 import os
 import sys
 import numpy as np
 import pandas as pd
-import joblib
-import xgboost as xgb
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import r2_score, mean_absolute_error
 import warnings
@@ -16,6 +16,8 @@ warnings.filterwarnings("ignore")
 # data_utils.py 불러오기
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 import data_utils
+import simulator
+from model_pack import ModelPack
 
 # --------------------------- 
 # 1) 설정
@@ -34,77 +36,43 @@ REGRESSOR_MODEL_PATHS = {
 DATA_PATH = "../Data_Madang/auction_preprocessed.csv"
 THRESHOLD = 0.45
 RANDOM_STATE = 42
+CACHE_DIR = "cache" # None이면 디스크 캐시(.npz)를 사용하지 않음
 
 # --------------------------- 
-# 2) 시뮬레이터 함수
+# 2) 모델별 예측 (캐시)
 # --------------------------- 
-def run_classification_simulation(item_row, model_pack, max_rounds=8):
-    results = []
-    model = model_pack["model"]
-    imputer = model_pack["imputer"]
-    scaler = model_pack["scaler"]
-    feature_cols = model_pack["features"]
-    num_cols = imputer.feature_names_in_
-    cat_cols_in_model = [c for c in feature_cols if c not in num_cols]
-
-    for k in range(max_rounds + 1):
-        sim_item = item_row.copy()
-        sim_item["유찰횟수"] = k
-        sim_item["최저가"] = data_utils.calc_min_price_by_round(sim_item["감정가"], k, sim_item["소재지"])
-        sim_df = data_utils.feature_engineer(pd.DataFrame([sim_item]))
-        X_num = sim_df[num_cols]
-        X_cat = pd.DataFrame(index=sim_df.index)
-        for c in cat_cols_in_model:
-            if c in sim_df.columns:
-                X_cat[c] = sim_df[c].fillna("NA").astype("category").cat.codes
-            else:
-                X_cat[c] = 0
-        X_num_imp = pd.DataFrame(imputer.transform(X_num), columns=num_cols)
-        X_full = pd.concat([X_num_imp, X_cat], axis=1)[feature_cols]
-        X_scaled = pd.DataFrame(scaler.transform(X_full), columns=feature_cols)
-
-        if X_scaled.isnull().sum().sum() > 0:
-            X_scaled.fillna(0, inplace=True)
-
-        if isinstance(model, xgb.Booster):
-            dmatrix = xgb.DMatrix(X_scaled)
-            prob = model.predict(dmatrix)[0]
-        else:
-            prob = model.predict_proba(X_scaled)[:, 1][0]
-
-        results.append({
-            "round": k, "prob": float(prob), "data_for_prediction": sim_df.iloc[0]
-        })
-    return results
-
-def predict_hammer_price(item_data_df, model_pack):
-    model = model_pack["model"]
-    imputer = model_pack["imputer"]
-    scaler = model_pack["scaler"]
-    feature_cols = model_pack["features"]
-    num_cols = imputer.feature_names_in_
-    cat_cols_in_model = [c for c in feature_cols if c not in num_cols]
-    
-    X_num = item_data_df[num_cols]
-    X_cat = pd.DataFrame(index=item_data_df.index)
-    for c in cat_cols_in_model:
-        if c in item_data_df.columns:
-            X_cat[c] = item_data_df[c].fillna("NA").astype("category").cat.codes
-        else:
-            X_cat[c] = 0
-    X_num_imp = pd.DataFrame(imputer.transform(X_num), columns=num_cols)
-    X_full = pd.concat([X_num_imp, X_cat], axis=1)[feature_cols]
-    X_scaled = pd.DataFrame(scaler.transform(X_full), columns=feature_cols)
-
-    if X_scaled.isnull().sum().sum() > 0:
-        X_scaled.fillna(0, inplace=True)
-
-    if isinstance(model, xgb.Booster):
-        dmatrix = xgb.DMatrix(X_scaled)
-        predicted_price = model.predict(dmatrix)[0]
-    else:
-        predicted_price = model.predict(X_scaled)[0]
-    return predicted_price
+def load_model_packs(base_dir, model_paths):
+    """모델 팩을 한 번씩만 로드하고, 파일 해시와 함께 반환합니다."""
+    packs = {}
+    for name, rel_path in model_paths.items():
+        path = os.path.join(base_dir, rel_path)
+        try:
+            packs[name] = (ModelPack.load(path), data_utils.file_hash(path))
+        except FileNotFoundError as e:
+            print(f"[오류] 모델 파일을 찾을 수 없습니다: {e.filename}")
+    return packs
+
+def compute_classifier_probs(df_test, classifier_packs, data_hash, cache_dir):
+    """분류기별 (N, 회차) 낙찰 확률을 분류기당 한 번만 계산합니다."""
+    probs = {}
+    for name, (pack, model_hash) in classifier_packs.items():
+        key = simulator.cache_key("clf", model_hash, data_hash, f"r{simulator.MAX_ROUNDS}")
+        probs[name] = simulator.cached_array(
+            key, lambda: simulator.predict_round_probabilities(df_test, pack), cache_dir
+        )
+        print(f"[INFO] {name}: 회차별 낙찰 확률 준비 완료.")
+    return probs
+
+def compute_regressor_grids(df_test, regressor_packs, data_hash, cache_dir):
+    """회귀 모델별 (N, 회차) 낙찰가 예측을 회귀 모델당 한 번만 계산합니다."""
+    grids = {}
+    for name, (pack, model_hash) in regressor_packs.items():
+        key = simulator.cache_key("reg", model_hash, data_hash, f"r{simulator.MAX_ROUNDS}")
+        grids[name] = simulator.cached_array(
+            key, lambda: simulator.predict_hammer_price_grid(df_test, pack), cache_dir
+        )
+        print(f"[INFO] {name}: 회차별 낙찰가 예측 준비 완료.")
+    return grids
 
 # --------------------------- 
 # 3) 메인 실행
@@ -115,7 +83,7 @@ def main():
     # --- 데이터 로드 및 준비 (한 번만 실행) ---
     print("[INFO] 데이터 준비 및 분할 중...")
     full_path = os.path.join(base_dir, DATA_PATH)
-    df = data_utils.load_and_clean(full_path)
+    df = data_utils.load_dataset(full_path)
     if df is None: return
     df_with_label = data_utils.define_label(df)
     try:
@@ -131,47 +99,41 @@ def main():
         df_test = df_test.sample(n=100, random_state=RANDOM_STATE)
     print(f"[INFO] 최종 시뮬레이션 대상 테스트 케이스 수: {len(df_test)}")
 
+    # --- 모델 로드 및 모델별 예측 (모델당 한 번만 실행) ---
+    classifier_packs = load_model_packs(base_dir, CLASSIFIER_MODEL_PATHS)
+    regressor_packs = load_model_packs(base_dir, REGRESSOR_MODEL_PATHS)
+    print("[INFO] 모델 로드 완료.")
+
+    cache_dir = os.path.join(base_dir, CACHE_DIR) if CACHE_DIR else None
+    data_hash = simulator.frame_hash(df_test)
+    clf_probs = compute_classifier_probs(df_test, classifier_packs, data_hash, cache_dir)
+    reg_grids = compute_regressor_grids(df_test, regressor_packs, data_hash, cache_dir)
+
+    actual = df_test['낙찰가'].to_numpy(dtype=np.float64)
+    item_idx = np.arange(len(df_test))
     results_summary = []
 
-    # --- 9개 조합에 대한 루프 실행 ---
-    for clf_name, clf_path in CLASSIFIER_MODEL_PATHS.items():
-        for reg_name, reg_path in REGRESSOR_MODEL_PATHS.items():
+    # --- M x K 조합을 캐시된 배열로 평가 ---
+    for clf_name, probs in clf_probs.items():
+        optimal_rounds = simulator.first_crossing_round(probs, THRESHOLD)
+        hit_mask = optimal_rounds >= 0
+
+        for reg_name, price_grid in reg_grids.items():
             
             print("\n" + "="*70)
             print(f"Testing Combination: [Classifier: {clf_name}] + [Regressor: {reg_name}]")
             print("="*70)
 
-            try:
-                classifier_pack = joblib.load(os.path.join(base_dir, clf_path))
-                regressor_pack = joblib.load(os.path.join(base_dir, reg_path))
-                print("[INFO] 모델 로드 완료.")
-            except FileNotFoundError as e:
-                print(f"[오류] 모델 파일을 찾을 수 없습니다: {e.filename}")
-                continue
-
-            actual_prices = []
-            predicted_prices = []
-
-            for _, item in df_test.iterrows():
-                simulation_history = run_classification_simulation(item, classifier_pack)
-                optimal_round_info = next((r for r in simulation_history if r["prob"] >= THRESHOLD), None)
-
-                if optimal_round_info:
-                    item_for_reg = pd.DataFrame([optimal_round_info["data_for_prediction"]])
-                    predicted_price = predict_hammer_price(item_for_reg, regressor_pack)
-                    actual_prices.append(item['낙찰가'])
-                    predicted_prices.append(predicted_price)
-            
-            if actual_prices:
-                actual_prices_arr = np.array(actual_prices)
-                predicted_prices_arr = np.array(predicted_prices)
+            if hit_mask.any():
+                actual_prices_arr = actual[hit_mask]
+                predicted_prices_arr = price_grid[item_idx[hit_mask], optimal_rounds[hit_mask]]
                 
                 # 성능 지표 계산
                 mape = np.mean(np.abs((actual_prices_arr - predicted_prices_arr) / actual_prices_arr)) * 100
                 mae = mean_absolute_error(actual_prices_arr, predicted_prices_arr)
                 r2 = r2_score(actual_prices_arr, predicted_prices_arr)
 
-                print(f"MAPE: {mape:.2f}% | MAE: {mae:,.0f} | R^2: {r2:.4f} (성공: {len(actual_prices)}/{len(df_test)})")
+                print(f"MAPE: {mape:.2f}% | MAE: {mae:,.0f} | R^2: {r2:.4f} (성공: {len(actual_prices_arr)}/{len(df_test)})")
                 
                 results_summary.append({
                     "Classifier": clf_name,
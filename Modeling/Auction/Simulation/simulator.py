@@ -0,0 +1,190 @@
+"""
+경매 회차 시뮬레이션 배치 엔진
+- N건의 경매 데이터를 (N x 회차) 피처 행렬로 한 번에 확장하고,
+  모든 회차를 단일 predict / predict_proba 호출로 평가합니다.
+"""
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+
+import data_utils
+from model_pack import as_model_pack
+
+MAX_ROUNDS = 8
+
+# 회차 확장/예측 로직이 바뀌면 올려서 기존 결과 캐시(.npz)를 무효화합니다.
+SIMULATOR_VERSION = 1
+
+# 계산 결과 배열의 메모리 캐시 (키: 캐시 키 문자열)
+_array_cache = {}
+
+# 회차(유찰횟수)에 따라 값이 달라지는 피처
+ROUND_DEPENDENT_COLS = ["유찰횟수", "최저가", "최저비율"]
+
+# ---------------------------
+# 1) 피처 행렬 생성
+# ---------------------------
+def build_round_features(item_df, model_pack, rounds):
+    """
+    경매 건별로 지정한 회차들의 전처리된 피처 행렬을 생성합니다.
+    :param item_df: N건의 경매 데이터 (load_and_clean 결과 형태)
+    :param model_pack: ModelPack 또는 학습 스크립트가 저장한 dict 형태의 모델 팩
+    :param rounds: (N, K) 형태의 회차 배열. 1차원 배열이면 모든 건에 같은 회차 목록을 적용합니다.
+    :return: (N, K, F) 형태의 float32 배열 (F = len(features))
+    """
+    pack = as_model_pack(model_pack)
+    n_items = len(item_df)
+    n_features = len(pack.features)
+
+    rounds = np.asarray(rounds)
+    if rounds.ndim == 1:
+        rounds = np.broadcast_to(rounds, (n_items, len(rounds)))
+    n_rounds = rounds.shape[1]
+
+    # 회차와 무관한 파생 변수 및 범주형 코드는 N건에 대해 한 번만 계산
+    base = data_utils.feature_engineer(item_df.copy())
+    X = pack.raw_matrix(base)
+    X = np.repeat(X[:, None, :], n_rounds, axis=1)
+
+    # 회차별 최저가: 감정가 * r ** k
+    appraisal = base["감정가"].to_numpy(dtype=np.float64)[:, None]
+    r = data_utils.get_rule_based_r_array(base["소재지"])[:, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        min_price = appraisal * (r ** rounds)
+        round_values = {
+            "유찰횟수": rounds.astype(np.float64),
+            "최저가": min_price,
+            "최저비율": min_price / appraisal,
+        }
+    for c in ROUND_DEPENDENT_COLS:
+        if c in pack.num_cols:
+            X[:, :, pack.col_index[c]] = round_values[c]
+
+    # 결측치 처리 및 스케일링 (N*K 행을 한 번에)
+    X = pack.transform(X.reshape(n_items * n_rounds, n_features))
+    return X.reshape(n_items, n_rounds, n_features)
+
+# ---------------------------
+# 2) 모델 예측
+# ---------------------------
+def predict_round_probabilities(item_df, model_pack, max_rounds=MAX_ROUNDS):
+    """
+    N건의 경매 데이터에 대해 0 ~ max_rounds 회차의 낙찰 확률을 한 번에 계산합니다.
+    :return: (N, max_rounds+1) 형태의 확률 배열
+    """
+    if len(item_df) == 0:
+        return np.empty((0, max_rounds + 1))
+    rounds = np.arange(max_rounds + 1)
+    pack = as_model_pack(model_pack)
+    X = build_round_features(item_df, pack, rounds)
+    n_items, n_rounds, n_features = X.shape
+    probs = pack.predict_transformed(X.reshape(-1, n_features))
+    return np.asarray(probs, dtype=np.float64).reshape(n_items, n_rounds)
+
+def min_prices_by_round(item_df, max_rounds=MAX_ROUNDS):
+    """N건의 경매 데이터에 대해 회차별 최저입찰가 (N, max_rounds+1) 배열을 반환합니다."""
+    appraisal = item_df["감정가"].to_numpy(dtype=np.float64)[:, None]
+    r = data_utils.get_rule_based_r_array(item_df["소재지"])[:, None]
+    return appraisal * (r ** np.arange(max_rounds + 1))
+
+def first_crossing_round(probs, threshold):
+    """
+    확률이 처음으로 임계값 이상이 되는 회차를 찾습니다.
+    :param threshold: 단일 임계값 또는 (T,) 형태의 임계값 배열
+    :return: (N,) 또는 (T, N) 형태의 회차 배열. 어떤 회차에서도 넘지 못하면 -1
+    """
+    threshold = np.asarray(threshold, dtype=np.float64)
+    crossed = probs >= threshold[..., None, None]
+    first = crossed.argmax(axis=-1)
+    return np.where(crossed.any(axis=-1), first, -1)
+
+def predict_hammer_prices(item_df, model_pack, rounds):
+    """
+    경매 건별로 지정한 회차의 데이터로 낙찰가를 한 번에 예측합니다.
+    :param rounds: (N,) 형태의 회차 배열
+    :return: (N,) 형태의 예측 낙찰가 배열
+    """
+    if len(item_df) == 0:
+        return np.empty(0)
+    pack = as_model_pack(model_pack)
+    rounds = np.asarray(rounds)[:, None]
+    X = build_round_features(item_df, pack, rounds)[:, 0, :]
+    return np.asarray(pack.predict_transformed(X), dtype=np.float64)
+
+def predict_hammer_price_grid(item_df, model_pack, max_rounds=MAX_ROUNDS):
+    """
+    N건의 경매 데이터에 대해 0 ~ max_rounds 모든 회차의 낙찰가를 한 번에 예측합니다.
+    :return: (N, max_rounds+1) 형태의 예측 낙찰가 배열
+    """
+    if len(item_df) == 0:
+        return np.empty((0, max_rounds + 1))
+    pack = as_model_pack(model_pack)
+    X = build_round_features(item_df, pack, np.arange(max_rounds + 1))
+    n_items, n_rounds, n_features = X.shape
+    preds = pack.predict_transformed(X.reshape(-1, n_features))
+    return np.asarray(preds, dtype=np.float64).reshape(n_items, n_rounds)
+
+def predict_hammer_prices_for_rounds(item_df, model_pack, round_table):
+    """
+    회차 표(-1은 예측 제외)에 등장하는 (건, 회차) 조합을 중복 제거한 뒤 한 번의 배치로 낙찰가를 예측합니다.
+    :param round_table: (..., N) 형태의 회차 배열 (예: first_crossing_round의 (T, N) 결과)
+    :return: round_table과 같은 형태의 예측 낙찰가 배열 (예측 제외 위치는 NaN)
+    """
+    round_table = np.asarray(round_table)
+    out = np.full(round_table.shape, np.nan)
+    hits = round_table >= 0
+    if not hits.any():
+        return out
+
+    item_idx = np.broadcast_to(np.arange(len(item_df)), round_table.shape)[hits]
+    stride = int(round_table.max()) + 1
+    unique_keys, inverse = np.unique(item_idx * stride + round_table[hits], return_inverse=True)
+
+    preds = predict_hammer_prices(
+        item_df.iloc[unique_keys // stride], model_pack, unique_keys % stride
+    )
+    out[hits] = preds[inverse]
+    return out
+
+# ---------------------------
+# 3) 결과 캐시
+# ---------------------------
+def frame_hash(df):
+    """데이터프레임 내용(인덱스 포함)의 해시값을 반환합니다."""
+    row_hashes = pd.util.hash_pandas_object(df, index=True).to_numpy()
+    h = hashlib.sha1(row_hashes.tobytes())
+    h.update("|".join(map(str, df.columns)).encode("utf-8"))
+    return h.hexdigest()[:16]
+
+def cache_key(kind, *parts):
+    """
+    cached_array용 캐시 키를 만듭니다.
+    SIMULATOR_VERSION과 data_utils.DATA_UTILS_VERSION을 포함하므로 코드가 바뀌면 키도 바뀝니다.
+    :param kind: 결과 종류 (예: 'clf', 'reg')
+    :param parts: 모델 해시, 데이터 해시 등 결과를 결정하는 값들
+    """
+    return "_".join([kind, *map(str, parts), f"s{SIMULATOR_VERSION}", f"d{data_utils.DATA_UTILS_VERSION}"])
+
+def cached_array(key, compute, cache_dir=None):
+    """
+    key에 해당하는 배열을 메모리 캐시 -> 디스크(.npz) 캐시 -> compute() 순서로 가져옵니다.
+    :param key: 캐시 키 (cache_key로 모델 해시, 데이터 해시 등을 조합한 문자열)
+    :param compute: 캐시에 없을 때 배열을 계산하는 함수
+    :param cache_dir: .npz 파일을 저장할 폴더. None이면 메모리 캐시만 사용합니다.
+    """
+    if key in _array_cache:
+        return _array_cache[key]
+
+    cache_path = os.path.join(cache_dir, f"{key}.npz") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        with np.load(cache_path) as data:
+            values = data["values"]
+    else:
+        values = compute()
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            np.savez(cache_path, values=values)
+
+    _array_cache[key] = values
+    return values
@@ -72,13 +72,10 @@ def main():
     # 1. 데이터 로드 및 전처리 (data_utils.py 함수 사용)
     base_dir = os.path.dirname(os.path.abspath(__file__))
     full_data_path = os.path.join(base_dir, DATA_PATH)
-    df = data_utils.load_and_clean(full_data_path)
+    # 정제 -> 라벨 정의 -> 증강 -> 피처 엔지니어링 결과를 캐시에서 불러옴
+    df = data_utils.load_dataset(full_data_path, stage="augmented")
     if df is None: return
     
-    df = data_utils.define_label(df)
-    df = data_utils.augment_data(df)
-    df = data_utils.feature_engineer(df)
-    
     # 2. 학습 데이터 준비 (data_utils.py 함수 사용)
     X, y, num_imputer, scaler = data_utils.prepare_training_data(df)
     
@@ -99,7 +96,8 @@ def main():
         "model": model,
         "imputer": num_imputer,
         "scaler": scaler,
-        "features": list(X.columns)
+        "features": list(X.columns),
+        "categories": data_utils.category_tables(df)
     }
     joblib.dump(model_pack, model_path)
     print(f"\n[INFO] 모델 저장 완료: {model_path}")
@@ -71,11 +71,9 @@ def evaluate_regressor(model, X, y):
 def main():
     base_dir = os.path.dirname(os.path.abspath(__file__))
     full_data_path = os.path.join(base_dir, DATA_PATH)
-    df = data_utils.load_and_clean(full_data_path)
+    df = data_utils.load_dataset(full_data_path, stage="engineered")
     if df is None: return
     
-    df = data_utils.feature_engineer(df)
-    
     df_success = df[df['낙찰가'].notnull()].copy()
     print(f"[INFO] 회귀 모델 학습을 위한 데이터 크기: {len(df_success)}")
     
@@ -94,7 +92,8 @@ def main():
         "model": model,
         "imputer": imputer,
         "scaler": scaler,
-        "features": list(X.columns)
+        "features": list(X.columns),
+        "categories": data_utils.category_tables(df_success)
     }
     joblib.dump(model_pack, model_path)
     print(f"\n[INFO] 모델 저장 완료: {model_path}")